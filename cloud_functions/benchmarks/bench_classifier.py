@@ -0,0 +1,172 @@
+"""
+Micro-benchmark of the shared taxonomy classifier against the row-by-row
+functions it replaced in the two cleaners.
+
+The labels must match the old functions exactly.  The one intended
+change is the food inspection default label, 'Other' -> 'other' (those
+rows are dropped by the cleaner either way).
+
+Run from ``cloud_functions/``:
+
+    python benchmarks/bench_classifier.py [rows]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from common.classifier import combine_text  # noqa: E402
+from common.taxonomy import FACILITY_CLASSIFIER, LICENSE_CLASSIFIER, OTHER  # noqa: E402
+
+
+# Previous row-by-row implementations, kept here as the baseline
+
+def categorize_facility_type(ftype):
+    all_food_keywords = ['raising cane', '7-eleven', 'pizza hut', 'wingstop', 'jimmy johns', 'dunkin',
+        'potbelly', 'chick-fil-a', 'dominos', 'mcdonald', 'kentucky', 'kfc',
+        'shake shack', 'burger king', 'taco bell', 'subway', 'wendy', 'popeyes', 'steakhouse',
+        'bistro', 'chophouse', 'prime', 'fine dining', 'coffee', 'cafe', 'espresso', 'tea',
+        'starbucks', 'bakery', 'pastry', 'patisserie', 'bar', 'pub', 'tavern', 'lounge',
+        'brewery', 'wine', 'cocktail', 'taproom']
+    fast_food_keywords = [
+        'raising cane', '7-eleven', 'pizza hut', 'wingstop', 'jimmy johns', 'dunkin',
+        'potbelly', 'chick-fil-a', 'dominos', 'mcdonald', 'kentucky', 'kfc',
+        'shake shack', 'burger king', 'taco bell', 'subway', 'wendy', 'popeyes'
+    ]
+    fine_dining_keywords = ['steakhouse', 'bistro', 'chophouse', 'prime', 'fine dining']
+    cafe_keywords = ['coffee', 'cafe', 'espresso', 'tea', 'starbucks', 'bakery', 'pastry', 'patisserie']
+    bar_keywords = ['bar', 'pub', 'tavern', 'lounge', 'brewery', 'wine', 'cocktail', 'taproom']
+
+    ftype = ftype.lower()
+    if any(kw in ftype for kw in ['grocery', 'market', 'liquor', 'retail', 'drug', 'drug store', 'convenience', 'supermarket', 'wholesale']):
+        return 'retail_grocery'
+    elif any(kw in ftype for kw in ['school', 'college', 'university']):
+        return 'school'
+    elif any(kw in ftype for kw in ['hospital', 'clinic', 'care', 'daycare', 'day care']):
+        return 'healthcare'
+    elif any(kw in ftype for kw in ['gym', 'fitness', 'yoga']):
+        return 'fitness'
+    elif any(kw in ftype for kw in ['theater', 'movie', 'club', 'stadium', 'rooftop']):
+        return 'entertainment'
+    elif any(kw in ftype for kw in ['hotel', 'motel']):
+        return 'hospitality'
+    elif any(kw in ftype for kw in ['church', 'temple', 'mosque', 'synagogue']):
+        return 'religious'
+    if any(kw in ftype for kw in all_food_keywords):
+        if any(kw in ftype for kw in fast_food_keywords):
+            return 'fast_food'
+        elif any(kw in ftype for kw in fine_dining_keywords):
+            return 'fine_dining'
+        elif any(kw in ftype for kw in cafe_keywords):
+            return 'cafe'
+        elif any(kw in ftype for kw in bar_keywords):
+            return 'bar'
+        else:
+            return 'restaurant'
+    else:
+        return 'Other'
+
+
+def categorize_food_place(row):
+    desc = str(row.get('license_description', '')).lower()
+    name = str(row.get('entity_name', '')).lower()
+    text = f"{desc} {name}"
+
+    all_food_keywords = ['panda express','raising cane', 'pizza hut', 'wingstop', 'jimmy johns', 'dunkin',
+        'potbelly', 'chick-fil-a', 'dominos', 'mcdonald', 'kentucky', 'kfc',
+        'shake shack', 'burger king', 'taco bell', 'subway', 'wendy', 'popeyes', 'steak','steakhouse',
+        'bistro', 'chophouse', 'prime', 'fine dining', 'coffee', 'cafe', 'espresso', 'tea',
+        'starbucks', 'bakery', 'pastry', 'patisserie', 'bar', 'pub', 'tavern', 'lounge',
+        'brewery', 'wine', 'cocktail', 'taproom', 'restaurant', 'pizza', 'burger']
+    fast_food_keywords = [
+        'raising cane', 'pizza hut', 'wingstop', 'jimmy johns', 'dunkin',
+        'potbelly', 'chick-fil-a', 'dominos', 'mcdonald', 'kentucky', 'kfc',
+        'shake shack', 'burger king', 'taco bell', 'subway', 'wendy', 'popeyes', 'panda express'
+    ]
+    fine_dining_keywords = ['steak', 'steakhouse', 'bistro', 'chophouse', 'prime', 'fine dining']
+    cafe_keywords = ['coffee', 'cafe', 'espresso', 'tea', 'starbucks', 'bakery', 'pastry', 'patisserie']
+    bar_keywords = ['bar', 'pub', 'tavern', 'lounge', 'brewery', 'wine', 'cocktail', 'taproom', 'beer']
+
+    if any(kw in text for kw in ['grocery', 'market', 'liquor', 'store', 'drug', 'drug store', 'convenience', 'supermarket', 'wholesale', '7-eleven', 'cvs', 'walgreens']):
+        return 'retail_grocery'
+    elif any(kw in text for kw in ['school', 'college', 'university']):
+        return 'school'
+    elif any(kw in text for kw in ['hospital', 'clinic', 'care', 'daycare', 'day care']):
+        return 'healthcare'
+    elif any(kw in text for kw in ['gym', 'fitness', 'yoga']):
+        return 'fitness'
+    elif any(kw in text for kw in ['theater', 'movie', 'club', 'stadium', 'rooftop']):
+        return 'entertainment'
+    elif any(kw in text for kw in ['hotel', 'motel', 'hospitality']):
+        return 'hospitality'
+    elif any(kw in text for kw in ['church', 'temple', 'mosque', 'synagogue']):
+        return 'religious'
+    elif any(kw in text for kw in all_food_keywords):
+        if any(kw in text for kw in fast_food_keywords):
+            return 'fast_food'
+        elif any(kw in text for kw in fine_dining_keywords):
+            return 'fine_dining'
+        elif any(kw in text for kw in cafe_keywords):
+            return 'cafe'
+        elif any(kw in text for kw in bar_keywords):
+            return 'bar'
+        else:
+            return 'restaurant'
+    else:
+        return 'other'
+
+
+def sample_text(rng, size):
+    # Mix of keywords, near misses and filler words, a few per value
+    words = np.array([
+        'Restaurant', 'Grocery Store', 'Daycare', 'Children\'s Services', 'Bakery', 'Coffee', 'TAVERN',
+        'Chick-Fil-A', 'Subway', 'Pizza', 'Beer', 'Wine', 'Liquor', 'Hotel', 'Church', 'Gym', 'School',
+        'Mobile Food', 'Catering', 'Shared Kitchen', 'Golden', 'Dragon', 'Express', 'Prime', 'Steak',
+        'Consumption on Premises', 'Retail Food Establishment', 'Tea', 'Lounge', 'Theater', 'Corner',
+    ])
+    parts = rng.choice(words, size=(size, 3))
+    lengths = rng.integers(1, 4, size=size)
+    return pd.Series([" ".join(row[:n]) for row, n in zip(parts, lengths)])
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<40} {time.perf_counter() - start:8.3f}s")
+    return result
+
+
+def check_labels(old, new, name):
+    # The food inspection function used 'Other' for the default label
+    old = old.replace('Other', OTHER).to_numpy()
+    differ = old != np.asarray(new)
+    assert not differ.any(), f"{differ.sum()} {name} categories differ, e.g. {old[differ][:5]}"
+
+
+def main(rows):
+    rng = np.random.default_rng(0)
+    facility_type = sample_text(rng, rows)
+    licenses = pd.DataFrame({
+        'license_description': sample_text(rng, rows),
+        'entity_name': sample_text(rng, rows),
+    })
+
+    print(f"{rows} rows")
+    old = timed("food inspections, row by row", lambda: facility_type.apply(categorize_facility_type))
+    new = timed("food inspections, vectorized", lambda: FACILITY_CLASSIFIER.classify(facility_type))
+    check_labels(old, new, "food inspection")
+
+    old = timed("business licenses, row by row", lambda: licenses.apply(categorize_food_place, axis=1))
+    new = timed("business licenses, vectorized", lambda: LICENSE_CLASSIFIER.classify(
+        combine_text(licenses['license_description'], licenses['entity_name'])))
+    check_labels(old, new, "business license")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,106 @@
+"""
+Benchmark of the foot traffic generator's bulk zoning lookup against the
+per-location lookup it replaced.
+
+With no arguments, a synthetic Chicago-sized zoning grid and traffic count
+locations are used.  For the real data, download the two generator inputs
+from the ``foot_traffic_gen_resources`` bucket and pass their paths:
+
+    python benchmarks/bench_foot_traffic_zoning.py chicago_traffic_counts_raw.csv Chicago_Zoning_Data.geojson
+
+Run from ``cloud_functions/``.
+"""
+
+import importlib.util
+import os
+import sys
+import time
+
+import geopandas as gp
+import numpy as np
+import pandas as pd
+import shapely
+from shapely.geometry import Point
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_zoning import CHICAGO_BOUNDS, sample_zoning  # noqa: E402
+from common.zoning import ZoningIndex  # noqa: E402
+
+
+def load_generator():
+    path = os.path.join(ROOT, "generation", "foot_traffic_data", "main.py")
+    spec = importlib.util.spec_from_file_location("foot_traffic_generator", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# Previous per-location implementation, kept here as the baseline
+def get_block_type_from_zoning(latitude, longitude, zoning_gdf):
+    point = Point(longitude, latitude)
+    _ = zoning_gdf.sindex
+    for _, row in zoning_gdf.iloc[list(zoning_gdf.sindex.intersection(point.bounds))].iterrows():
+        if row.geometry.contains(point):
+            z = row["zone_class"].strip()
+            if z.startswith("R") or z.startswith("M"):
+                return 0
+            if z.startswith(("B", "C")):
+                return 1
+            if z.startswith(("D", "DC")):
+                return 2
+            return 1
+    return None
+
+
+def sample_inputs(rng, size):
+    zoning_df = sample_zoning(rng, 15_000)
+    zoning_gdf = gp.GeoDataFrame(
+        {"zone_class": zoning_df["zone_class"]},
+        geometry=shapely.from_geojson(zoning_df["geometry"].to_numpy()),
+        crs="EPSG:4326",
+    )
+    xmin, ymin, xmax, ymax = CHICAGO_BOUNDS
+    locations_df = pd.DataFrame({
+        "Latitude": rng.uniform(ymin - 0.02, ymax + 0.02, size).round(4),
+        "Longitude": rng.uniform(xmin - 0.02, xmax + 0.02, size).round(4),
+    })
+    return locations_df, zoning_gdf
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<40} {time.perf_counter() - start:8.3f}s")
+    return result
+
+
+def main(args):
+    if len(args) == 2:
+        locations_df = pd.read_csv(args[0])[["Latitude", "Longitude"]].round(4).dropna().drop_duplicates()
+        zoning_gdf = gp.read_file(args[1])
+    else:
+        locations_df, zoning_gdf = sample_inputs(np.random.default_rng(0), 2_000)
+
+    generator = load_generator()
+    latitude = locations_df["Latitude"].to_numpy(dtype=float)
+    longitude = locations_df["Longitude"].to_numpy(dtype=float)
+
+    print(f"{len(locations_df)} locations, {len(zoning_gdf)} zoning polygons")
+    old = timed("per-location sindex lookup", lambda: [
+        get_block_type_from_zoning(lat, lon, zoning_gdf) for lat, lon in zip(latitude, longitude)
+    ])
+    new = timed("bulk lookup (index build included)", lambda: generator.get_block_types(
+        latitude, longitude,
+        ZoningIndex.from_geometries(np.asarray(zoning_gdf.geometry), zoning_gdf["zone_class"]),
+    ))
+
+    old = np.array([-1 if block is None else block for block in old])
+    # Overlapping polygons may resolve to a different (first) match
+    print(f"{(old != new).sum()} of {len(new)} block types differ")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,91 @@
+"""
+Benchmark of zoning assignment with ``common.zoning.ZoningIndex`` against
+the GeoPandas spatial join it replaced in the master table.
+
+The synthetic dataset is Chicago-sized: a grid of zoning polygons over the
+city's extent (about the ~15k polygons of the real zoning layer) and
+random points around it, some of them ``POINT(0 0)`` placeholders.
+
+Run from ``cloud_functions/``:
+
+    python benchmarks/bench_zoning.py [points] [polygons]
+"""
+
+import json
+import os
+import sys
+import time
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+from shapely.geometry import mapping, shape
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.zoning import ZoningIndex  # noqa: E402
+
+CHICAGO_BOUNDS = (-87.94, 41.64, -87.52, 42.02)
+ZONE_CLASSES = np.array(['RS-3', 'RT-4', 'B3-2', 'C1-2', 'DX-12', 'M1-2', 'PD 1234', 'POS-1'])
+
+
+def sample_zoning(rng, polygons):
+    # Grid cells over the city, as GeoJSON strings like the zoning table stores them
+    xmin, ymin, xmax, ymax = CHICAGO_BOUNDS
+    side = int(np.sqrt(polygons))
+    xs = np.linspace(xmin, xmax, side + 1)
+    ys = np.linspace(ymin, ymax, side + 1)
+    boxes = [shapely.box(xs[i], ys[j], xs[i + 1], ys[j + 1]) for i in range(side) for j in range(side)]
+    # Densify the edges so polygons have a realistic number of vertices
+    boxes = shapely.segmentize(boxes, (xs[1] - xs[0]) / 16)
+    return pd.DataFrame({
+        'geometry': [json.dumps(mapping(box)) for box in boxes],
+        'zone_class': rng.choice(ZONE_CLASSES, size=len(boxes)),
+    })
+
+
+def sample_points(rng, size):
+    xmin, ymin, xmax, ymax = CHICAGO_BOUNDS
+    x = rng.uniform(xmin - 0.05, xmax + 0.05, size)
+    y = rng.uniform(ymin - 0.05, ymax + 0.05, size)
+    placeholder = rng.random(size) < 0.05
+    x[placeholder] = 0
+    y[placeholder] = 0
+    return shapely.points(x, y)
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<40} {time.perf_counter() - start:8.3f}s")
+    return result
+
+
+def legacy(zoning_df, points):
+    # Previous master table code path
+    zoning_df = zoning_df.copy()
+    zoning_df['geometry'] = zoning_df['geometry'].apply(lambda x: shape(json.loads(x)))
+    zoning_gdf = gpd.GeoDataFrame(zoning_df, geometry='geometry', crs='EPSG:4326')
+    points_gdf = gpd.GeoDataFrame(geometry=points, crs='EPSG:4326')
+    joined = gpd.sjoin(points_gdf, zoning_gdf[['geometry', 'zone_class']], how='left', predicate='within')
+    return joined[~joined.index.duplicated()]['zone_class'].to_numpy(dtype=object, na_value=None)
+
+
+
+
+def main(size, polygons):
+    rng = np.random.default_rng(0)
+    zoning_df = sample_zoning(rng, polygons)
+    points = sample_points(rng, size)
+
+    print(f"{size} points, {len(zoning_df)} polygons")
+    old = timed("geopandas sjoin", lambda: legacy(zoning_df, points))
+    index = timed("ZoningIndex build", lambda: ZoningIndex.from_geojson(zoning_df['geometry'], zoning_df['zone_class']))
+    new = timed("ZoningIndex lookup", lambda: index.zone_classes(points))
+    assert (old == new).all(), "zone classes differ"
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 15_000)
@@ -1,30 +1,40 @@
 import os
 import json
+from datetime import datetime, timezone
 import numpy as np
 import pandas as pd
 from google.cloud import bigquery
 
+from common.bq_read import read_dataframe
+from common.change_detection import inputs_unchanged, mark_table_changed
+from common.geometry import points, to_wkb
+from common.query import SourceQuery
+
+# Only the columns the cleaner keeps are read from BigQuery
+SOURCE = SourceQuery(
+    columns=['longitude', 'latitude', 'systemstop', 'street', 'cross_st', 'city', 'public_nam'],
+)
+
 def clean_cta_bus_stations(request):
     client = bigquery.Client()
 
     input_table = os.environ["INPUT_TABLE"]
     output_table = os.environ["OUTPUT_TABLE"]
 
-    # Retrieve the raw data into a pandas DataFrame
-    query = f"SELECT * FROM `{input_table}`"
-    df = client.query(query).to_dataframe()
+    # Nothing to do if the input has not changed since the output was built
+    if inputs_unchanged(client, request, [input_table], output_table):
+        print(f"{input_table} has not changed since {output_table} was built; skipped.")
+        return f"{input_table} unchanged; {output_table} left as is."
+    started_at = datetime.now(timezone.utc)
 
-    # Drop/rename some columns
-    df = df.drop(['dir','pos','routesstpg'],axis=1)
+    # Retrieve the projected data into a pandas DataFrame
+    df = read_dataframe(client, SOURCE.sql(input_table))
+
+    # Rename some columns
     df = df.rename(columns={'systemstop':'bus_stop_id', 'public_nam': 'entity_name'})
 
-    # Cast as a point
-    df['location'] = df.apply(
-        lambda row: f"POINT({row['longitude']} {row['latitude']})" 
-        if pd.notnull(row['longitude']) and pd.notnull(row['latitude']) 
-        else None,
-        axis=1
-    )
+    # Cast as a point, as WKB for the GEOGRAPHY column
+    df['location'] = to_wkb(points(df['longitude'], df['latitude']))
 
     # Define the job config
     job_config = bigquery.LoadJobConfig(
@@ -43,6 +53,7 @@ def clean_cta_bus_stations(request):
 
     job = client.load_table_from_dataframe(df, output_table, job_config=job_config)
     job.result()  # Wait for the load job to complete
+    mark_table_changed(client, output_table, started_at)
 
     print(f"Successfully loaded cleaned data to {output_table} (table replaced)")
 
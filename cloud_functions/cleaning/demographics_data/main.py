@@ -1,25 +1,43 @@
 import os
 import json
+from datetime import datetime, timezone
 import numpy as np
 import pandas as pd
 from google.cloud import bigquery
 
+from common.bq_read import read_dataframe
+from common.change_detection import inputs_unchanged, mark_table_changed
+from common.query import SourceQuery
+
+# Only the columns and rows the cleaner keeps are read from BigQuery
+SOURCE = SourceQuery(
+    columns=[
+        'year', 'zip_code', 'population_total', 'population_0_to_17', 'population_18_to_29',
+        'population_30_to_39', 'population_40_to_49', 'population_50_to_59', 'population_60_to_69',
+        'population_70_to_79', 'population_80', 'population_female', 'population_male',
+        'population_latinx', 'population_asian', 'population_black', 'population_white',
+        'population_other',
+    ],
+    # Keep only the zip codes that are not 'Chicago'
+    where=["zip_code IS NULL OR zip_code != 'Chicago'"],
+)
+
 def clean_chicago_demographics(request):
     client = bigquery.Client()
 
     input_table = os.environ["INPUT_TABLE"]
     output_table = os.environ["OUTPUT_TABLE"]
 
-    # Retrieve the raw data into a pandas DataFrame
-    query = f"SELECT * FROM `{input_table}`"
-    df = client.query(query).to_dataframe()
+    # Nothing to do if the input has not changed since the output was built
+    if inputs_unchanged(client, request, [input_table], output_table):
+        print(f"{input_table} has not changed since {output_table} was built; skipped.")
+        return f"{input_table} unchanged; {output_table} left as is."
+    started_at = datetime.now(timezone.utc)
 
-    print(f"Retrieved {len(df)} rows from {input_table}")
+    # Retrieve the projected, pre-filtered data into a pandas DataFrame
+    df = read_dataframe(client, SOURCE.sql(input_table))
 
-    # Drop some columns 
-    df = df.drop(['geography_type','record_id'],axis=1)
-    # Keep only the zip codes that are not 'Chicago'
-    df = df[df['zip_code'] != 'Chicago']
+    print(f"Retrieved {len(df)} rows from {input_table}")
 
     # Write the cleaned DataFrame to the OUTPUT_TABLE in BigQuery, replacing existing data
     job_config = bigquery.LoadJobConfig(
@@ -29,6 +47,7 @@ def clean_chicago_demographics(request):
 
     job = client.load_table_from_dataframe(df, output_table, job_config=job_config)
     job.result()  # Wait for the load job to complete
+    mark_table_changed(client, output_table, started_at)
 
     print(f"Successfully loaded cleaned data to {output_table} (table replaced)")
 
@@ -1,33 +1,45 @@
 import os
 import json
+from datetime import datetime, timezone
 import numpy as np
 import pandas as pd
 from google.cloud import bigquery
 
+from common.bq_read import read_dataframe
+from common.change_detection import inputs_unchanged, mark_table_changed
+from common.geometry import points, to_wkb
+from common.query import SourceQuery
+
+# Only the columns and rows the cleaner keeps are read from BigQuery
+SOURCE = SourceQuery(
+    columns=['id', 'station_name', 'total_docks', 'docks_in_service', 'status',
+             'latitude', 'longitude', 'location_type', 'location_coordinates'],
+    # Keep only rows where status is 'In Service'
+    where=["status = 'In Service'"],
+)
+
 def clean_divvy_station_data(request):
     client = bigquery.Client()
 
     input_table = os.environ["INPUT_TABLE"]
     output_table = os.environ["OUTPUT_TABLE"]
 
-    # Retrieve the raw data into a pandas DataFrame
-    query = f"SELECT * FROM `{input_table}`"
-    df = client.query(query).to_dataframe()
+    # Nothing to do if the input has not changed since the output was built
+    if inputs_unchanged(client, request, [input_table], output_table):
+        print(f"{input_table} has not changed since {output_table} was built; skipped.")
+        return f"{input_table} unchanged; {output_table} left as is."
+    started_at = datetime.now(timezone.utc)
+
+    # Retrieve the projected, pre-filtered data into a pandas DataFrame
+    df = read_dataframe(client, SOURCE.sql(input_table))
 
     print(f"Retrieved {len(df)} rows from {input_table}")
 
-    # rename columns and drop unnecessary ones
+    # rename columns
     df = df.rename(columns={'id':'divvy_station_id', 'station_name':'entity_name'})
-    df = df.drop(columns=['short_name'])
-    # Keep only rows where status is 'In Service'
-    df = df[df['status'] == 'In Service']
 
-    # Create WKT 'location' column using existing coordinate columns
-    df['location'] = df.apply(
-        lambda row: f"POINT({row['longitude']} {row['latitude']})"
-        if pd.notnull(row['longitude']) and pd.notnull(row['latitude']) else None,
-        axis=1
-    )
+    # Create the 'location' point (WKB) from the existing coordinate columns
+    df['location'] = to_wkb(points(df['longitude'], df['latitude']))
 
     # Write the cleaned DataFrame to the OUTPUT_TABLE in BigQuery, replacing existing data
     job_config = bigquery.LoadJobConfig(
@@ -47,6 +59,7 @@ def clean_divvy_station_data(request):
 
     job = client.load_table_from_dataframe(df, output_table, job_config=job_config)
     job.result()  # Wait for the load job to complete
+    mark_table_changed(client, output_table, started_at)
 
     print(f"Successfully loaded cleaned data to {output_table} (table replaced)")
 
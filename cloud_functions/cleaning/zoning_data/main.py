@@ -1,33 +1,44 @@
 import os
 import json
+from datetime import datetime, timezone
 import numpy as np
 import pandas as pd
 from google.cloud import bigquery
 
+from common.bq_read import read_dataframe
+from common.change_detection import inputs_unchanged, mark_table_changed
+from common.query import SourceQuery
+
+# Only the columns the cleaner keeps are read from BigQuery
+SOURCE = SourceQuery(
+    columns=[
+        'geometry',
+        'zoning_id',
+        'zone_class',
+        'edit_date',
+        'shape_area',
+        'shape_len',
+        'objectid'
+    ],
+)
+
 def clean_chicago_zoning(request):
     client = bigquery.Client()
 
     input_table = os.environ["INPUT_TABLE"]
     output_table = os.environ["OUTPUT_TABLE"]
 
-    # Retrieve the raw data into a pandas DataFrame
-    query = f"SELECT * FROM `{input_table}`"
-    df = client.query(query).to_dataframe()
+    # Nothing to do if the input has not changed since the output was built
+    if inputs_unchanged(client, request, [input_table], output_table):
+        print(f"{input_table} has not changed since {output_table} was built; skipped.")
+        return f"{input_table} unchanged; {output_table} left as is."
+    started_at = datetime.now(timezone.utc)
+
+    # Retrieve the projected data into a pandas DataFrame
+    df = read_dataframe(client, SOURCE.sql(input_table), categoricals=("zone_class",))
 
     print(f"Retrieved {len(df)} rows from {input_table}")
 
-    # Select columns to keep
-    col_to_keep = [
-        'geometry',
-        'zoning_id',
-        'zone_class',
-        'edit_date',
-        'shape_area',
-        'shape_len',
-        'objectid'
-    ]
-    df = df[col_to_keep]
-    
      #Add a boolean column for zone_class cols that can have restaurants
     def add_restaurant_allowed(df):
         licenses = ["B1", "B2", "B3", "C1", "C2", "C3", "DC", "DX", "DS", "M1", "M2", "M3","PMD"]
@@ -45,6 +56,7 @@ def clean_chicago_zoning(request):
 
     job = client.load_table_from_dataframe(df, output_table, job_config=job_config)
     job.result()  # Wait for the load job to complete
+    mark_table_changed(client, output_table, started_at)
 
     print(f"Successfully loaded cleaned data to {output_table} (table replaced)")
 
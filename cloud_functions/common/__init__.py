@@ -0,0 +1,6 @@
+"""
+Code shared between the MetroGrub cloud functions.
+
+Each function directory links to this package (``common -> ../../common``)
+so that ``zip -r`` bundles it into the function's deployment archive.
+"""
@@ -0,0 +1,23 @@
+"""
+Batch loading of ingested data into BigQuery.
+
+The Parquet parts committed by ``common.checkpoints`` are loaded with a
+single load job, which replaces the previous streaming inserts into a
+staging table.
+"""
+
+from google.cloud import bigquery
+
+
+def load_parquet_uri(client: bigquery.Client, uri: str, table_id: str, schema: list,
+                     write_disposition: str = bigquery.WriteDisposition.WRITE_TRUNCATE) -> bigquery.LoadJob:
+    # One atomic load job: the table is either fully replaced or left untouched
+    job_config = bigquery.LoadJobConfig(
+        source_format=bigquery.SourceFormat.PARQUET,
+        schema=schema,
+        write_disposition=write_disposition,
+    )
+    job = client.load_table_from_uri(uri, table_id, job_config=job_config)
+    job.result()  # Wait for the load job to complete
+    print(f"Loaded {job.output_rows} rows into {table_id}.")
+    return job
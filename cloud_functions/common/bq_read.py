@@ -0,0 +1,96 @@
+"""
+Fast query result downloads through the BigQuery Storage Read API.
+
+Results are streamed as Arrow record batches over a bounded number of
+parallel read streams instead of being paged through the REST row
+iterator, and converted to pandas once at the end.  Low-cardinality string
+columns can be dictionary-encoded on the way so they arrive as pandas
+categoricals.  Several queries can be run and downloaded concurrently
+with ``read_dataframes``.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from google.cloud import bigquery
+from google.cloud import bigquery_storage
+from google.cloud.bigquery import _pandas_helpers
+
+MAX_STREAM_COUNT = 4  # parallel read streams per result
+
+# Same nullable dtypes that RowIterator.to_dataframe() uses by default
+PANDAS_TYPES = {
+    pa.int64(): pd.Int64Dtype(),
+    pa.bool_(): pd.BooleanDtype(),
+}
+
+_read_client = None
+
+
+def read_client() -> bigquery_storage.BigQueryReadClient:
+    # One Storage Read client per instance, reused across warm invocations
+    global _read_client
+    if _read_client is None:
+        _read_client = bigquery_storage.BigQueryReadClient()
+    return _read_client
+
+
+def job_to_arrow(job: bigquery.QueryJob, max_stream_count: int = MAX_STREAM_COUNT) -> pa.Table:
+    rows = job.result()
+    batches = list(rows.to_arrow_iterable(bqstorage_client=read_client(), max_stream_count=max_stream_count))
+    if not batches:
+        # Nothing to stream; the iterator is consumed, so build the empty table from the result schema
+        return _pandas_helpers.bq_to_arrow_schema(rows.schema).empty_table()
+    return pa.Table.from_batches(batches)
+
+
+def to_dataframe(table: pa.Table, categoricals: tuple = ()) -> pd.DataFrame:
+    # Columns named in ``categoricals`` that are present become pandas categoricals
+    for name in categoricals:
+        index = table.schema.get_field_index(name)
+        if index != -1:
+            table = table.set_column(index, name, pc.dictionary_encode(table[name]))
+    return table.to_pandas(types_mapper=PANDAS_TYPES.get)
+
+
+def read_arrow(client: bigquery.Client, query: str, max_stream_count: int = MAX_STREAM_COUNT,
+               job_config: bigquery.QueryJobConfig | None = None) -> pa.Table:
+    return job_to_arrow(client.query(query, job_config=job_config), max_stream_count)
+
+
+def read_dataframe(client: bigquery.Client, query: str, categoricals: tuple = (),
+                   max_stream_count: int = MAX_STREAM_COUNT,
+                   job_config: bigquery.QueryJobConfig | None = None) -> pd.DataFrame:
+    """
+    Run ``query`` and download the result as a DataFrame.
+
+    Columns named in ``categoricals`` that are present in the result are
+    returned as pandas categoricals.  ``job_config`` carries query
+    parameters, if any.
+    """
+    return to_dataframe(read_arrow(client, query, max_stream_count, job_config), categoricals)
+
+
+def read_dataframes(client: bigquery.Client, queries: dict, categoricals: tuple = (),
+                    max_stream_count: int = MAX_STREAM_COUNT) -> dict:
+    """
+    Run several queries concurrently and download them as DataFrames.
+
+    All query jobs are started first so they run side by side in BigQuery,
+    then the results are downloaded in a thread pool.  Returns a dict with
+    the same keys as ``queries``.
+    """
+    jobs = {name: client.query(query) for name, query in queries.items()}
+    read_client()  # create the shared Storage Read client before the threads use it
+
+    def download(name):
+        start = time.perf_counter()
+        df = to_dataframe(job_to_arrow(jobs[name], max_stream_count), categoricals)
+        print(f"Downloaded {len(df)} rows from {name} in {time.perf_counter() - start:.1f}s")
+        return df
+
+    with ThreadPoolExecutor(max_workers=len(jobs) or 1) as executor:
+        return dict(zip(jobs, executor.map(download, jobs)))
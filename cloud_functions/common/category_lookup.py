@@ -0,0 +1,113 @@
+"""
+Persistent lookup of already classified text values.
+
+Every distinct (normalized) text a classifier has labelled is stored in a
+BigQuery table in the ingestion metadata dataset, keyed by the classifier
+name and rule fingerprint.  The next run loads those labels and only
+classifies strings it has not seen before.  Changing the rules changes the
+fingerprint, so stale labels are never reused.
+
+The table only keeps the values seen in the latest run of each classifier:
+when a run finds new values, or stored values that no longer occur, the
+classifier's rows are replaced with that run's values.  This bounds the
+table by one input's distinct values even for near-unique keys such as
+license description plus business name, and drops rows of old fingerprints.
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from google.api_core.exceptions import NotFound
+from google.cloud import bigquery
+
+from common.bq_read import read_dataframe
+from common.incremental import WATERMARK_DATASET
+
+LOOKUP_TABLE = "category_lookup"
+
+
+def lookup_table_id(project: str) -> str:
+    return f"{project}.{WATERMARK_DATASET}.{LOOKUP_TABLE}"
+
+
+class CategoryLookup:
+    def __init__(self, client: bigquery.Client, name: str):
+        self.client = client
+        self.name = name  # which classifier the stored labels belong to
+        self.table_id = lookup_table_id(client.project)
+
+    def load(self, fingerprint: str) -> dict:
+        # text -> label for everything classified with these exact rules
+        query = f"""
+            SELECT text, category
+            FROM `{self.table_id}`
+            WHERE classifier = @classifier AND fingerprint = @fingerprint
+        """
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[
+                bigquery.ScalarQueryParameter("classifier", "STRING", self.name),
+                bigquery.ScalarQueryParameter("fingerprint", "STRING", fingerprint),
+            ]
+        )
+        try:
+            df = read_dataframe(self.client, query, job_config=job_config)
+        except NotFound:
+            return {}
+        return dict(zip(df["text"], df["category"]))
+
+    def replace(self, fingerprint: str, texts: list, labels: list):
+        # Keep only this run's values: drop every stored row of this classifier, then save
+        query = f"DELETE FROM `{self.table_id}` WHERE classifier = @classifier"
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[bigquery.ScalarQueryParameter("classifier", "STRING", self.name)]
+        )
+        try:
+            self.client.query(query, job_config=job_config).result()
+        except NotFound:
+            pass  # the load below creates the table
+        self.save(fingerprint, texts, labels)
+
+    def save(self, fingerprint: str, texts: list, labels: list):
+        df = pd.DataFrame({
+            "classifier": self.name,
+            "fingerprint": fingerprint,
+            "text": texts,
+            "category": labels,
+        })
+        job_config = bigquery.LoadJobConfig(
+            schema=[
+                bigquery.SchemaField("classifier", "STRING"),
+                bigquery.SchemaField("fingerprint", "STRING"),
+                bigquery.SchemaField("text", "STRING"),
+                bigquery.SchemaField("category", "STRING"),
+            ],
+            write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
+        )
+        self.client.load_table_from_dataframe(df, self.table_id, job_config=job_config).result()
+
+    def label_codes(self, classifier, uniques: pa.Array) -> np.ndarray:
+        """
+        Label codes for the distinct normalized ``uniques``, classifying and
+        storing only the values not found in the lookup table.
+        """
+        fingerprint = classifier.fingerprint
+        known = self.load(fingerprint)
+        texts = uniques.to_pylist()
+
+        missing = [i for i, text in enumerate(texts) if text not in known]
+        codes = np.empty(len(texts), dtype=np.int64)
+        for i, text in enumerate(texts):
+            if text in known:
+                codes[i] = classifier.labels.index(known[text])
+
+        if missing:
+            codes[missing] = classifier.label_codes(uniques.take(pa.array(missing, type=pa.int64())))
+
+        # Stored values that did not occur in this run
+        stale = len(known) - (len(texts) - len(missing))
+        if missing or stale:
+            self.replace(fingerprint, texts, [classifier.labels[code] for code in codes])
+
+        print(f"Classified {len(missing)} new of {len(texts)} distinct values for {self.name}; "
+              f"dropped {stale} stale values.")
+        return codes
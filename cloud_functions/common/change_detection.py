@@ -0,0 +1,128 @@
+"""
+Content digests for skipping unchanged datasets.
+
+A full ingestion run hashes every fetched page and compares the combined
+digest with the one stored for the dataset in the ingestion metadata
+table.  If nothing changed the load is skipped, and ``last_changed_at`` is
+left untouched so downstream stages (cleaning, master table) can tell that
+their inputs are the same as last time.
+
+Every stage records ``last_changed_at`` for the table it writes, keyed by
+table name like the ingestion datasets, and skips its work when its output
+was built after all of its inputs last changed (``inputs_unchanged``).
+``?force=true`` on the trigger always runs the stage.
+"""
+
+import hashlib
+import json
+from datetime import datetime
+
+from google.api_core.exceptions import NotFound
+from google.cloud import bigquery
+
+from common.incremental import watermark_table_id
+
+
+def page_digest(page: list) -> str:
+    # System fields (:id, :updated_at, ...) are left out so that a touch
+    # without a content change does not count as a change
+    content = [{key: value for key, value in row.items() if not key.startswith(":")} for row in page]
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def get_content_digest(client: bigquery.Client, project: str, dataset_name: str) -> str | None:
+    query = f"""
+        SELECT content_digest
+        FROM `{watermark_table_id(project)}`
+        WHERE dataset_name = @dataset_name
+    """
+    job_config = bigquery.QueryJobConfig(
+        query_parameters=[bigquery.ScalarQueryParameter("dataset_name", "STRING", dataset_name)]
+    )
+    try:
+        rows = list(client.query(query, job_config=job_config).result())
+    except NotFound:
+        return None
+    return rows[0]["content_digest"] if rows else None
+
+
+def last_changed_at(client: bigquery.Client, project: str, dataset_names: list) -> dict:
+    # dataset name -> when it last changed in BigQuery; unknown datasets are left out
+    query = f"""
+        SELECT dataset_name, last_changed_at
+        FROM `{watermark_table_id(project)}`
+        WHERE dataset_name IN UNNEST(@dataset_names)
+    """
+    job_config = bigquery.QueryJobConfig(
+        query_parameters=[bigquery.ArrayQueryParameter("dataset_names", "STRING", list(dataset_names))]
+    )
+    try:
+        rows = list(client.query(query, job_config=job_config).result())
+    except NotFound:
+        return {}
+    return {row["dataset_name"]: row["last_changed_at"] for row in rows if row["last_changed_at"]}
+
+
+def table_key(table_id: str) -> str:
+    # Metadata rows are keyed by table name, which is the ingestion dataset name for raw tables
+    return table_id.split(".")[-1]
+
+
+def table_project(table_id: str) -> str:
+    return table_id.split(".")[0]
+
+
+def is_forced(request) -> bool:
+    if request is not None and getattr(request, "args", None):
+        return request.args.get("force", "").lower() in ("1", "true", "yes")
+    return False
+
+
+def inputs_unchanged(client: bigquery.Client, request, input_tables: list, output_table: str) -> bool:
+    """
+    True when ``output_table`` was built after every input table last
+    changed, so the stage writing it can skip its work.
+
+    An input or output with no recorded change counts as changed, as does
+    ``?force=true`` on the trigger.
+    """
+    if is_forced(request):
+        return False
+    inputs = [table_key(table) for table in input_tables]
+    output = table_key(output_table)
+    changed = last_changed_at(client, table_project(output_table), inputs + [output])
+    if output not in changed or any(name not in changed for name in inputs):
+        return False
+    return all(changed[name] <= changed[output] for name in inputs)
+
+
+def mark_table_changed(client: bigquery.Client, table_id: str, changed_at: datetime):
+    # ``changed_at`` is when the stage started reading its inputs, so an input
+    # that changes while the stage runs is still newer than the output
+    record_change(client, table_project(table_id), table_key(table_id), None, changed_at)
+
+
+def record_change(client: bigquery.Client, project: str, dataset_name: str, digest: str | None,
+                  changed_at: datetime | None = None):
+    # Mark the dataset as changed at ``changed_at`` (default: now).  Incremental runs pass
+    # no digest, which clears it so the next full run cannot wrongly match a stale one.
+    query = f"""
+        MERGE `{watermark_table_id(project)}` AS t
+        USING (SELECT @dataset_name AS dataset_name, @digest AS content_digest,
+                      COALESCE(@changed_at, CURRENT_TIMESTAMP()) AS last_changed_at) AS s
+        ON t.dataset_name = s.dataset_name
+        WHEN MATCHED THEN
+            UPDATE SET content_digest = s.content_digest,
+                       last_changed_at = s.last_changed_at
+        WHEN NOT MATCHED THEN
+            INSERT (dataset_name, content_digest, last_changed_at)
+            VALUES (s.dataset_name, s.content_digest, s.last_changed_at)
+    """
+    job_config = bigquery.QueryJobConfig(
+        query_parameters=[
+            bigquery.ScalarQueryParameter("dataset_name", "STRING", dataset_name),
+            bigquery.ScalarQueryParameter("digest", "STRING", digest),
+            bigquery.ScalarQueryParameter("changed_at", "TIMESTAMP", changed_at),
+        ]
+    )
+    client.query(query, job_config=job_config).result()
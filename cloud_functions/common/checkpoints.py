@@ -0,0 +1,120 @@
+"""
+Resumable ingestion checkpoints in GCS.
+
+Every fetched page is written as its own Parquet part under
+``ingestion/<dataset>/`` and recorded in a ``manifest.json`` next to it.
+If a run fails midway, the next run finds the manifest, skips the offsets
+already committed and only fetches what is missing.  A successful load
+clears the prefix.
+
+Socrata pages are ``:id``-ordered offset windows, so committed parts are
+only valid while the dataset has not changed underneath them.  A manifest
+is therefore only resumed when it was started with the same watermark and
+the same total row count, less than ``MAX_CHECKPOINT_AGE`` ago; anything
+else is discarded and the pull starts over.
+"""
+
+import hashlib
+import io
+import json
+from datetime import datetime, timedelta, timezone
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from google.cloud import storage
+
+MANIFEST_NAME = "manifest.json"
+MAX_CHECKPOINT_AGE = timedelta(hours=24)
+
+
+def stale_reason(manifest: dict, watermark: str | None, total: int) -> str | None:
+    # Why a manifest cannot be resumed, or None if it can
+    if manifest.get("watermark") != watermark:
+        return "started with another watermark"
+    if manifest.get("total") != total:
+        return f"row count changed from {manifest.get('total')} to {total}"
+    started_at = manifest.get("started_at")
+    if started_at is None or datetime.now(timezone.utc) - datetime.fromisoformat(started_at) > MAX_CHECKPOINT_AGE:
+        return f"started at {started_at}, more than {MAX_CHECKPOINT_AGE} ago"
+    return None
+
+
+class IngestionCheckpoint:
+    def __init__(self, bucket_name: str, dataset_name: str, watermark: str | None, total: int,
+                 completed: dict | None = None, latest: str | None = None, digests: dict | None = None,
+                 started_at: str | None = None):
+        self.bucket = storage.Client().bucket(bucket_name)
+        self.prefix = f"ingestion/{dataset_name}/"
+        self.watermark = watermark       # $where watermark this run was started with
+        self.total = total               # row count reported by Socrata when the run started
+        self.started_at = started_at or datetime.now(timezone.utc).isoformat()
+        self.completed = completed or {}  # offset -> row count of committed pages
+        self.latest = latest             # highest :updated_at seen so far
+        self.digests = digests or {}     # offset -> content digest of committed pages
+
+    @classmethod
+    def open(cls, bucket_name: str, dataset_name: str, watermark: str | None,
+             total: int) -> "IngestionCheckpoint":
+        # Resume an interrupted run if it was started recently, on the same watermark and row count
+        checkpoint = cls(bucket_name, dataset_name, watermark, total)
+        manifest_blob = checkpoint.bucket.blob(checkpoint.prefix + MANIFEST_NAME)
+        if not manifest_blob.exists():
+            return checkpoint
+
+        manifest = json.loads(manifest_blob.download_as_bytes())
+        reason = stale_reason(manifest, watermark, total)
+        if reason:
+            print(f"Discarding checkpoint for {dataset_name}: {reason}.")
+            checkpoint.clear()
+            return checkpoint
+
+        completed = {int(offset): count for offset, count in manifest["completed"].items()}
+        digests = {int(offset): digest for offset, digest in manifest.get("digests", {}).items()}
+        print(f"Resuming {dataset_name} with {len(completed)} pages already committed.")
+        return cls(bucket_name, dataset_name, watermark, total, completed, manifest.get("latest"), digests,
+                   manifest["started_at"])
+
+    @property
+    def uri(self) -> str:
+        # Wildcard matching every committed part, for a single load job
+        return f"gs://{self.bucket.name}/{self.prefix}part-*.parquet"
+
+    @property
+    def num_rows(self) -> int:
+        return sum(self.completed.values())
+
+    @property
+    def content_digest(self) -> str:
+        # Digest of the whole dataset, combined from the page digests in offset order
+        combined = hashlib.sha256()
+        for offset in sorted(self.digests):
+            combined.update(f"{offset}:{self.digests[offset]}\n".encode())
+        return combined.hexdigest()
+
+    def commit(self, offset: int, batch: pa.RecordBatch, latest: str | None, digest: str):
+        buffer = io.BytesIO()
+        pq.write_table(pa.Table.from_batches([batch]), buffer, compression="snappy")
+        buffer.seek(0)
+        self.bucket.blob(f"{self.prefix}part-{offset:010d}.parquet").upload_from_file(buffer)
+
+        # The manifest is only updated once the part is safely stored
+        self.completed[offset] = batch.num_rows
+        self.latest = latest
+        self.digests[offset] = digest
+        manifest = {
+            "watermark": self.watermark,
+            "total": self.total,
+            "started_at": self.started_at,
+            "latest": self.latest,
+            "completed": {str(offset): count for offset, count in sorted(self.completed.items())},
+            "digests": {str(offset): digest for offset, digest in sorted(self.digests.items())},
+        }
+        self.bucket.blob(self.prefix + MANIFEST_NAME).upload_from_string(
+            json.dumps(manifest), content_type="application/json"
+        )
+
+    def clear(self):
+        for blob in self.bucket.list_blobs(prefix=self.prefix):
+            blob.delete()
+        self.completed = {}
+        self.digests = {}
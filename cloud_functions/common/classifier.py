@@ -0,0 +1,104 @@
+"""
+Vectorized keyword classification of text columns.
+
+A classifier is an ordered list of ``Rule``s.  Each rule's keywords are
+compiled once into a single alternation regex, and every rule is evaluated
+over the column in one Arrow compute pass.  The first rule that matches a
+row wins, which keeps the priority order of the chained
+``if any(kw in text ...)`` checks it replaces.  Text columns repeat the
+same few hundred values, so only the distinct values are classified.
+"""
+
+import hashlib
+import json
+import re
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+
+@dataclass(frozen=True)
+class Rule:
+    label: str
+    keywords: tuple
+    requires: tuple = ()  # the text must also contain one of these for the rule to apply
+
+
+def keyword_pattern(keywords) -> str:
+    # Plain substring matching, as with `kw in text`
+    return "|".join(re.escape(keyword) for keyword in keywords)
+
+
+class Classifier:
+    def __init__(self, rules: list, default: str):
+        self.rules = list(rules)
+        self.default = default
+        self.labels = list(dict.fromkeys([rule.label for rule in self.rules] + [default]))
+        self.patterns = [
+            (keyword_pattern(rule.keywords), keyword_pattern(rule.requires) if rule.requires else None)
+            for rule in self.rules
+        ]
+
+    @property
+    def fingerprint(self) -> str:
+        # Changes whenever a rule, its order or the default changes
+        definition = [[rule.label, list(rule.keywords), list(rule.requires)] for rule in self.rules]
+        return hashlib.sha256(json.dumps([definition, self.default]).encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def normalize(text) -> pa.Array:
+        # Lower-cased Arrow strings, with nulls treated as empty strings
+        if isinstance(text, pd.Series):
+            text = pa.array(text.astype(object), type=pa.string(), from_pandas=True)
+        if isinstance(text, pa.ChunkedArray):
+            text = text.combine_chunks()
+        return pc.utf8_lower(pc.fill_null(text, ""))
+
+    def label_codes(self, text: pa.Array) -> np.ndarray:
+        # Index into self.labels for every value of already normalized text.
+        # One pass per rule (and per distinct gate) over the whole column.
+        cache = {}
+
+        def matches(pattern):
+            if pattern not in cache:
+                cache[pattern] = pc.match_substring_regex(text, pattern).to_numpy(zero_copy_only=False)
+            return cache[pattern]
+
+        conditions = []
+        for pattern, requires in self.patterns:
+            condition = matches(pattern)
+            if requires is not None:
+                condition = condition & matches(requires)
+            conditions.append(condition)
+
+        return np.select(conditions, [self.labels.index(rule.label) for rule in self.rules],
+                         default=self.labels.index(self.default))
+
+    def classify(self, text, lookup=None) -> pd.Categorical:
+        """
+        Classify every value of ``text`` (a pandas Series or Arrow array).
+
+        Only the distinct values are classified and the labels are broadcast
+        back by dictionary code.  With a ``lookup`` (see
+        ``common.category_lookup``) values classified on earlier runs are
+        not classified again.
+        """
+        encoded = pc.dictionary_encode(self.normalize(text))
+        if lookup is not None:
+            unique_codes = lookup.label_codes(self, encoded.dictionary)
+        else:
+            unique_codes = self.label_codes(encoded.dictionary)
+        codes = unique_codes[encoded.indices.to_numpy(zero_copy_only=False)]
+        return pd.Categorical.from_codes(codes, categories=self.labels)
+
+
+def combine_text(*columns: pd.Series) -> pa.Array:
+    # Space-joined, lower-cased text of several columns, e.g. description and name
+    arrays = [
+        pc.fill_null(pa.array(column.astype(object), type=pa.string(), from_pandas=True), "")
+        for column in columns
+    ]
+    return pc.utf8_lower(pc.binary_join_element_wise(*arrays, " "))
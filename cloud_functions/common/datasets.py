@@ -0,0 +1,166 @@
+"""
+Declarative specs for the City of Chicago datasets we ingest.
+
+Adding a dataset is a new ``DatasetSpec`` here plus a one-line entry point
+calling ``common.ingestion.ingest``.  ``fields`` maps each BigQuery column
+to its source path in the Socrata JSON; ``types`` lists the non-string
+coercions (see ``common.ingestion.ARROW_TYPES``).
+"""
+
+from common.ingestion import DatasetSpec
+
+
+def _same(*names: str) -> dict:
+    # Columns whose BigQuery name matches the Socrata field name
+    return {name: name for name in names}
+
+
+FOOD_INSPECTIONS = DatasetSpec(
+    name="food_inspections_data",
+    resource_id="4ijn-s7e5",
+    dataset="chicago_food_inspections",
+    fields=_same(
+        "inspection_id", "dba_name", "aka_name", "license_", "facility_type", "risk",
+        "address", "city", "state", "zip", "inspection_date", "inspection_type",
+        "results", "violations", "latitude", "longitude", "location",
+    ),
+    types={
+        "inspection_date": "timestamp",
+        "latitude": "float_or_zero",
+        "longitude": "float_or_zero",
+        "location": "json",
+    },
+    natural_key="inspection_id",
+)
+
+BUSINESS_LICENSES = DatasetSpec(
+    name="active_business_licenses",
+    resource_id="uupf-x98q",
+    dataset="chicago_active_business_licenses",
+    fields=_same(
+        "id", "license_id", "account_number", "site_number", "legal_name",
+        "doing_business_as_name", "address", "city", "state", "zip_code", "ward",
+        "precinct", "ward_precinct", "police_district", "community_area",
+        "community_area_name", "neighborhood", "license_code", "license_description",
+        "business_activity_id", "business_activity", "license_number", "application_type",
+        "application_requirements_complete", "payment_date", "conditional_approval",
+        "license_start_date", "expiration_date", "license_approved_for_issuance",
+        "date_issued", "license_status", "latitude", "longitude", "location",
+    ),
+    types={
+        "application_requirements_complete": "timestamp",
+        "payment_date": "timestamp",
+        "license_start_date": "timestamp",
+        "expiration_date": "timestamp",
+        "license_approved_for_issuance": "timestamp",
+        "date_issued": "timestamp",
+        "latitude": "float_or_zero",
+        "longitude": "float_or_zero",
+        "location": "json",
+    },
+    natural_key="license_id",
+)
+
+CTA_BUS_STATIONS = DatasetSpec(
+    name="cta_bus_stations_data",
+    resource_id="qs84-j7wh",
+    dataset="cta_bus_stations",
+    fields={
+        "longitude": "the_geom.coordinates.0",
+        "latitude": "the_geom.coordinates.1",
+        **_same("systemstop", "street", "cross_st", "dir", "pos", "routesstpg", "city", "public_nam"),
+    },
+    types={
+        "longitude": "float",
+        "latitude": "float",
+    },
+    natural_key="systemstop",
+)
+
+DIVVY_STATIONS = DatasetSpec(
+    name="divvy_stations_data",
+    resource_id="bbyy-e7gq",
+    dataset="divvy_stations",
+    fields={
+        **_same("id", "station_name", "short_name", "total_docks", "docks_in_service",
+                "status", "latitude", "longitude"),
+        "location_type": "location.type",
+        "location_coordinates": "location.coordinates",
+    },
+    types={
+        "total_docks": "int",
+        "docks_in_service": "int",
+        "latitude": "float",
+        "longitude": "float",
+        "location_coordinates": "json",
+    },
+    natural_key="id",
+)
+
+ZONING = DatasetSpec(
+    name="zoning_data",
+    resource_id="dj47-wfun",
+    dataset="chicago_zoning",
+    fields={
+        "geometry": "the_geom",
+        "case_number": "case_numbe",
+        "zoning_id": "zoning_id",
+        "zone_type": "zone_type",
+        "zone_class": "zone_class",
+        "create_date": "create_dat",
+        **_same("edit_date", "edit_uid", "pd_num", "shape_area", "shape_len",
+                "objectid", "globalid", "override_r"),
+    },
+    types={
+        "geometry": "json",
+        "create_date": "timestamp",
+        "edit_date": "timestamp",
+        "shape_area": "float_or_zero",
+        "shape_len": "float_or_zero",
+    },
+    natural_key="zoning_id",
+)
+
+DEMOGRAPHICS = DatasetSpec(
+    name="population_counts",
+    resource_id="85cm-7uqa",
+    dataset="chicago_demographics",
+    fields={
+        "geography_type": "geography_type",
+        "year": "year",
+        "zip_code": "geography",
+        "population_total": "population_total",
+        "population_0_to_17": "population_age_0_17",
+        "population_18_to_29": "population_age_18_29",
+        "population_30_to_39": "population_age_30_39",
+        "population_40_to_49": "population_age_40_49",
+        "population_50_to_59": "population_age_50_59",
+        "population_60_to_69": "population_age_60_69",
+        "population_70_to_79": "population_age_70_79",
+        "population_80": "population_age_80",
+        "population_female": "population_female",
+        "population_male": "population_male",
+        "population_latinx": "population_latinx",
+        "population_asian": "population_asian_non_latinx",
+        "population_black": "population_black_non_latinx",
+        "population_white": "population_white_non_latinx",
+        "population_other": "population_other_race_non",
+        "record_id": "record_id",
+    },
+    types={
+        "year": "int",
+        **{col: "int" for col in (
+            "population_total", "population_0_to_17", "population_18_to_29",
+            "population_30_to_39", "population_40_to_49", "population_50_to_59",
+            "population_60_to_69", "population_70_to_79", "population_80",
+            "population_female", "population_male", "population_latinx",
+            "population_asian", "population_black", "population_white", "population_other",
+        )},
+    },
+    natural_key="record_id",
+)
+
+DATASETS = {
+    spec.name: spec
+    for spec in (FOOD_INSPECTIONS, BUSINESS_LICENSES, CTA_BUS_STATIONS, DIVVY_STATIONS, ZONING, DEMOGRAPHICS)
+}
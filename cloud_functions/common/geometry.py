@@ -0,0 +1,34 @@
+"""
+Vectorized point geometry helpers for the cleaners.
+
+Points are built with shapely 2's array functions in one call per column
+instead of formatting or parsing one row at a time.  Rows with missing
+coordinates, or locations that do not parse as a GeoJSON point, become
+None.
+"""
+
+import numpy as np
+import pandas as pd
+import shapely
+
+
+def points(longitude: pd.Series, latitude: pd.Series) -> np.ndarray:
+    # Array of shapely Points, None where either coordinate is missing
+    x = pd.to_numeric(longitude, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    y = pd.to_numeric(latitude, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    valid = ~(np.isnan(x) | np.isnan(y))
+    geometries = np.full(len(x), None, dtype=object)
+    geometries[valid] = shapely.points(x[valid], y[valid])
+    return geometries
+
+
+def geojson_points(values: pd.Series) -> np.ndarray:
+    # Parse GeoJSON point strings, e.g. Socrata `location` columns
+    geometries = shapely.from_geojson(values.to_numpy(dtype=object, na_value=None), on_invalid="ignore")
+    geometries[shapely.get_type_id(geometries) != shapely.GeometryType.POINT] = None
+    return geometries
+
+
+def to_wkb(geometries: np.ndarray) -> np.ndarray:
+    # WKB bytes (None stays None); loads straight into BigQuery GEOGRAPHY columns
+    return shapely.to_wkb(geometries)
@@ -0,0 +1,137 @@
+"""
+Shared HTTP client for the City of Chicago (Socrata) API.
+
+Wraps a pooled keep-alive ``requests.Session`` with a token-bucket rate
+limiter, exponential backoff with full jitter on throttling and transient
+errors (honouring ``Retry-After``), gzip transfer encoding, the optional
+Socrata app token and per-request latency metrics.
+"""
+
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 6
+BACKOFF_BASE = 0.5   # seconds
+BACKOFF_MAX = 30.0   # seconds
+RATE_LIMIT = float(os.environ.get("SOCRATA_RATE_LIMIT", "8"))  # requests per second
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        # Block until a token is available; shared by all worker threads
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.latencies = []
+        self.retries = 0
+        self.throttled = 0
+        self.lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self.lock:
+            self.latencies.append(seconds)
+
+    def summary(self) -> str:
+        with self.lock:
+            latencies = sorted(self.latencies)
+        if not latencies:
+            return "0 requests"
+
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+        return (
+            f"{len(latencies)} requests, {self.retries} retries ({self.throttled} throttled), "
+            f"latency p50={percentile(0.50):.2f}s p95={percentile(0.95):.2f}s max={latencies[-1]:.2f}s"
+        )
+
+
+def retry_delay(attempt: int, response: requests.Response | None) -> float:
+    if response is not None and response.headers.get("Retry-After"):
+        try:
+            return min(BACKOFF_MAX, float(response.headers["Retry-After"]))
+        except ValueError:
+            pass  # HTTP-date form, fall back to backoff
+    # Full jitter: uniform over the exponential window
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+class HttpClient:
+    def __init__(self, pool_size: int, rate: float = RATE_LIMIT, max_retries: int = MAX_RETRIES):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.headers["Accept-Encoding"] = "gzip"
+
+        app_token = os.environ.get("SOCRATA_APP_TOKEN")
+        if app_token:
+            self.session.headers["X-App-Token"] = app_token
+
+        self.bucket = TokenBucket(rate)
+        self.max_retries = max_retries
+        self.metrics = RequestMetrics()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.session.close()
+
+    def get(self, url: str, params: dict | None = None, timeout: float = 60) -> requests.Response:
+        """
+        GET ``url`` with rate limiting and retries.
+
+        Retries on connection errors, timeouts and ``RETRY_STATUSES``; any
+        other error status raises ``requests.HTTPError`` straight away.
+        """
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            start = time.perf_counter()
+            response = None
+            try:
+                response = self.session.get(url, params=params, timeout=timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.max_retries:
+                    raise
+            finally:
+                self.metrics.record(time.perf_counter() - start)
+
+            if response is not None and response.status_code not in RETRY_STATUSES:
+                response.raise_for_status()
+                return response
+
+            if response is not None and attempt == self.max_retries:
+                response.raise_for_status()
+
+            delay = retry_delay(attempt, response)
+            with self.metrics.lock:
+                self.metrics.retries += 1
+                if response is not None and response.status_code == 429:
+                    self.metrics.throttled += 1
+            status = response.status_code if response is not None else "connection error"
+            print(f"Request to {url} failed ({status}); retrying in {delay:.1f}s.")
+            time.sleep(delay)
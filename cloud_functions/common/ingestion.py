@@ -0,0 +1,178 @@
+"""
+Schema-driven ingestion engine for the City of Chicago (Socrata) datasets.
+
+Every dataset is described by a ``DatasetSpec`` (see ``common/datasets.py``)
+and goes through the same fetch -> map -> load path.  Pages are mapped
+column by column straight into Arrow arrays instead of building one Python
+dict per row, and checkpointed to GCS page by page so the full dataset is
+never held in memory and an interrupted run can resume.
+"""
+
+import json
+import os
+from dataclasses import dataclass, field
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import requests
+from google.cloud import bigquery
+
+from common.socrata import count_dataset, fetch_pages
+from common.bigquery_load import load_parquet_uri
+from common.checkpoints import IngestionCheckpoint
+from common.change_detection import page_digest, get_content_digest, record_change
+from common.incremental import (
+    is_incremental, updated_since, latest_updated_at, get_watermark, set_watermark, merge_into
+)
+
+PROJECT = "purple-25-gradient-20250605"
+
+# Coercion name -> Arrow type of the resulting column
+ARROW_TYPES = {
+    "string": pa.string(),
+    "json": pa.string(),
+    "int": pa.int64(),
+    "float": pa.float64(),
+    "float_or_zero": pa.float64(),
+    "timestamp": pa.timestamp("us", tz="UTC"),
+}
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    name: str                    # BigQuery table name, also the watermark key
+    resource_id: str             # Socrata resource id, e.g. "4ijn-s7e5"
+    dataset: str                 # BigQuery dataset
+    fields: dict                 # output column -> source path ("location.type", "the_geom.coordinates.0")
+    types: dict = field(default_factory=dict)  # output column -> coercion, "string" if omitted
+    natural_key: str | None = None
+    project: str = PROJECT
+
+    @property
+    def table_id(self) -> str:
+        return f"{self.project}.{self.dataset}.{self.name}"
+
+    @property
+    def arrow_schema(self) -> pa.Schema:
+        return pa.schema([(col, ARROW_TYPES[self.types.get(col, "string")]) for col in self.fields])
+
+
+def column_values(page: list, path: str) -> list:
+    if "." not in path:
+        return [item.get(path) for item in page]
+
+    values = []
+    for item in page:
+        value = item
+        for key in path.split("."):
+            if isinstance(value, dict):
+                value = value.get(key)
+            elif isinstance(value, list) and key.isdigit() and int(key) < len(value):
+                value = value[int(key)]
+            else:
+                value = None
+                break
+        values.append(value)
+    return values
+
+
+def coerce(values: list, kind: str) -> pa.Array:
+    if kind == "json":
+        # Nested objects are stored as their JSON text
+        return pa.array([json.dumps(value) for value in values], type=pa.string())
+
+    array = pa.array(values)
+    if kind == "float_or_zero":
+        return pc.fill_null(pc.cast(array, pa.float64()), 0.0)
+    if kind == "timestamp":
+        # Socrata timestamps carry no offset; BigQuery stores them as UTC
+        return pc.assume_timezone(pc.cast(array, pa.timestamp("us")), "UTC")
+    return pc.cast(array, ARROW_TYPES[kind])
+
+
+def page_to_batch(spec: DatasetSpec, page: list) -> pa.RecordBatch:
+    arrays = [
+        coerce(column_values(page, path), spec.types.get(col, "string"))
+        for col, path in spec.fields.items()
+    ]
+    return pa.RecordBatch.from_arrays(arrays, schema=spec.arrow_schema)
+
+
+def ingest(spec: DatasetSpec, request) -> str:
+    client = bigquery.Client()
+
+    main_table_id = spec.table_id
+    staging_table_id = f"{main_table_id}_staging"
+
+    # In incremental mode only rows updated since the last run are requested
+    incremental = is_incremental(request) and spec.natural_key is not None
+    watermark = get_watermark(client, spec.project, spec.name) if incremental else None
+
+    where = updated_since(watermark)
+    try:
+        total = count_dataset(spec.resource_id, where)
+    except requests.RequestException as e:
+        reason = e.response.status_code if e.response is not None else e
+        print(f"Failed to count rows: {reason}")
+        return f"Failed to fetch data: {reason}"
+
+    # Every page is committed to GCS as it arrives, so a failed run resumes
+    # from its last committed offset and memory is bounded by the pages in flight
+    checkpoint = IngestionCheckpoint.open(os.environ["INGESTION_BUCKET"], spec.name, watermark, total)
+    latest = checkpoint.latest or watermark
+
+    try:
+        pages = fetch_pages(spec.resource_id, where=where, completed=checkpoint.completed, total=total)
+        for offset, page in pages:
+            print(f"Fetched {len(page)} records from offset {offset}.")
+            latest = latest_updated_at(page, latest)
+            checkpoint.commit(offset, page_to_batch(spec, page), latest, page_digest(page))
+    except requests.RequestException as e:
+        reason = e.response.status_code if e.response is not None else e
+        print(f"Failed to fetch data: {reason}")
+        print(f"{len(checkpoint.completed)} pages are checkpointed for the next run.")
+        return f"Failed to fetch data: {reason}"
+
+    print(f"Prepared {checkpoint.num_rows} rows for insertion.")
+
+    if checkpoint.num_rows == 0:
+        checkpoint.clear()
+        if watermark:
+            print(f"No records updated since {watermark}.")
+            return f"No records updated since {watermark}."
+        print("No records fetched; main table left unchanged.")
+        return "No records fetched; main table left unchanged."
+
+    # A full pull identical to the last one needs no load, and downstream
+    # stages see an unchanged last_changed_at
+    digest = None if watermark else checkpoint.content_digest
+    if digest and digest == get_content_digest(client, spec.project, spec.name):
+        set_watermark(client, spec.project, spec.name, latest)
+        checkpoint.clear()
+        print(f"No change in {spec.name} since the last load (digest {digest[:12]}); load skipped.")
+        return f"No change in {spec.name} since the last load; load skipped."
+
+    try:
+        schema = client.get_table(main_table_id).schema
+
+        if watermark:
+            # Stage the changed rows, then upsert them on the natural key
+            load_parquet_uri(client, checkpoint.uri, staging_table_id, schema)
+            merge_into(client, main_table_id, staging_table_id, key=spec.natural_key)
+            client.delete_table(staging_table_id, not_found_ok=True)
+            print(f"Deleted staging table {staging_table_id} after merge.")
+        else:
+            # Replace the main table in one atomic load job
+            load_parquet_uri(client, checkpoint.uri, main_table_id, schema)
+
+        set_watermark(client, spec.project, spec.name, latest)
+        record_change(client, spec.project, spec.name, digest)
+        checkpoint.clear()
+
+        if watermark:
+            return "Data successfully merged into main table."
+        return "Data successfully replaced in main table."
+
+    except Exception as e:
+        print(f"Error during ingestion load: {e}")
+        return f"Error during ingestion load: {e}"
@@ -0,0 +1,79 @@
+"""
+K-nearest-neighbour and radius search over longitude/latitude points.
+
+Points are embedded on the unit sphere (3D unit vectors) so a KD-tree's
+Euclidean distance is the chord between two points, which maps exactly to
+great-circle distance.  Distances are therefore in metres and undistorted
+at Chicago's latitude, unlike a KD-tree over raw degrees.  Queries use all
+cores (``workers=-1``).
+
+``inverse_distance_weighting`` interpolates a value at each query point
+from its k nearest indexed points, as returned by ``PointIndex.k_nearest``.
+"""
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+EARTH_RADIUS_M = 6_371_008.8  # mean Earth radius
+MIN_IDW_DISTANCE_M = 1.0      # a neighbour at the query point gets this distance, not zero
+
+
+def unit_vectors(longitude, latitude) -> np.ndarray:
+    lon = np.radians(np.asarray(longitude, dtype=float))
+    lat = np.radians(np.asarray(latitude, dtype=float))
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)))
+
+
+def chord_to_metres(chord: np.ndarray) -> np.ndarray:
+    # Infinite chords (no neighbour found) stay infinite
+    metres = 2 * EARTH_RADIUS_M * np.arcsin(np.clip(chord / 2, 0, 1))
+    return np.where(np.isinf(chord), np.inf, metres)
+
+
+def metres_to_chord(metres: float) -> float:
+    return 2 * np.sin(min(metres / EARTH_RADIUS_M, np.pi) / 2)
+
+
+class PointIndex:
+    def __init__(self, longitude, latitude):
+        self.tree = cKDTree(unit_vectors(longitude, latitude))
+
+    def k_nearest(self, longitude, latitude, k: int, max_distance_m: float = np.inf):
+        """
+        Distances in metres to, and indices of, the k nearest indexed points,
+        each as an (n, k) array sorted by distance.
+
+        Missing neighbours (fewer than k points, or none within
+        ``max_distance_m``) have an infinite distance and index ``len(self.tree.data)``.
+        """
+        upper_bound = metres_to_chord(max_distance_m) if np.isfinite(max_distance_m) else np.inf
+        points = unit_vectors(longitude, latitude)
+        chord, index = self.tree.query(points, k=k, distance_upper_bound=upper_bound, workers=-1)
+        # cKDTree drops the k axis for k=1
+        return chord_to_metres(chord).reshape(len(points), k), index.reshape(len(points), k)
+
+    def count_within(self, longitude, latitude, radius_m: float) -> np.ndarray:
+        # Number of indexed points within radius_m of each query point
+        return self.tree.query_ball_point(unit_vectors(longitude, latitude), metres_to_chord(radius_m),
+                                          return_length=True, workers=-1)
+
+
+def inverse_distance_weighting(distance_m: np.ndarray, index: np.ndarray, values,
+                               max_distance_m: float = np.inf, power: float = 2.0):
+    """
+    Inverse-distance weighted mean of ``values`` over the neighbours from
+    ``PointIndex.k_nearest`` that lie within ``max_distance_m``.
+
+    Returns the interpolated value (NaN where no neighbour is in range) and
+    the number of neighbours used for each point.
+    """
+    values = np.append(np.asarray(values, dtype=float), np.nan)  # index len(values) = no neighbour
+    within = distance_m <= max_distance_m
+    weights = np.where(within, np.maximum(distance_m, MIN_IDW_DISTANCE_M), np.inf) ** -power
+    neighbour_values = np.where(within, values[index], 0.0)
+
+    total_weight = weights.sum(axis=1)
+    estimate = np.full(len(distance_m), np.nan)
+    np.divide((weights * neighbour_values).sum(axis=1), total_weight, out=estimate, where=total_weight > 0)
+    return estimate, within.sum(axis=1)
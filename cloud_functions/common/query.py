@@ -0,0 +1,34 @@
+"""
+Source queries with column projection and filter push-down.
+
+Cleaning functions describe the columns and row filters they need as a
+``SourceQuery`` so that BigQuery only scans, and only sends back, what is
+actually used instead of ``SELECT *``.
+"""
+
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class SourceQuery:
+    columns: list                                # projected columns
+    where: list = field(default_factory=list)    # SQL predicates, ANDed together
+    distinct_on: list = field(default_factory=list)  # keep one row per combination of these columns
+
+    def sql(self, table: str) -> str:
+        query = f"SELECT {', '.join(f'`{col}`' for col in self.columns)}\nFROM `{table}`"
+        if self.where:
+            query += "\nWHERE " + "\n  AND ".join(f"({predicate})" for predicate in self.where)
+        if self.distinct_on:
+            partition = ", ".join(f"`{col}`" for col in self.distinct_on)
+            # QUALIFY needs a WHERE, GROUP BY or HAVING clause in the same query
+            if not self.where:
+                query += "\nWHERE TRUE"
+            query += f"\nQUALIFY ROW_NUMBER() OVER (PARTITION BY {partition}) = 1"
+        return query
+
+
+def select_wkb(table: str, geography: list) -> str:
+    # SELECT * with the GEOGRAPHY columns returned as WKB bytes instead of WKT text
+    replace = ", ".join(f"ST_ASBINARY(`{col}`) AS `{col}`" for col in geography)
+    return f"SELECT * REPLACE ({replace})\nFROM `{table}`"
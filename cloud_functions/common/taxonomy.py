@@ -0,0 +1,152 @@
+"""
+The shared business category taxonomy.
+
+One versioned module holding the category rules of every stage that
+categorizes places.  The two sources describe places differently, so each
+has its own keyword lists on a shared rule layout:
+``FACILITY_CLASSIFIER`` for food inspection facility types and
+``LICENSE_CLASSIFIER`` for business license descriptions plus names.
+License descriptions such as "Retail Food Establishment" are why
+``retail`` is only a retail keyword for facility types.  The classifiers
+are compiled once at import, i.e. once per cold start.  Bump
+``TAXONOMY_VERSION`` whenever the rules change.
+
+``python -m common.taxonomy [path]`` writes the rule sets as a JSON
+artifact for consumers outside the cloud functions.
+"""
+
+import json
+import sys
+
+import pandas as pd
+
+from common.classifier import Classifier, Rule
+
+TAXONOMY_VERSION = 2
+
+# Category labels; stages that select places by category import these
+RETAIL_GROCERY = 'retail_grocery'
+SCHOOL = 'school'
+HEALTHCARE = 'healthcare'
+FITNESS = 'fitness'
+ENTERTAINMENT = 'entertainment'
+HOSPITALITY = 'hospitality'
+RELIGIOUS = 'religious'
+FAST_FOOD = 'fast_food'
+FINE_DINING = 'fine_dining'
+CAFE = 'cafe'
+BAR = 'bar'
+RESTAURANT = 'restaurant'
+OTHER = 'other'
+
+FOOD_CATEGORIES = [FAST_FOOD, FINE_DINING, CAFE, BAR, RESTAURANT]
+
+CAFE_KEYWORDS = ('coffee', 'cafe', 'espresso', 'tea', 'starbucks', 'bakery', 'pastry', 'patisserie')
+
+
+def category_rules(retail, hospitality, fast_food, fine_dining, bar, all_food) -> list:
+    # In priority order: the first matching rule wins
+    return [
+        Rule(RETAIL_GROCERY, retail),
+        Rule(SCHOOL, ('school', 'college', 'university')),
+        Rule(HEALTHCARE, ('hospital', 'clinic', 'care', 'daycare', 'day care')),
+        Rule(FITNESS, ('gym', 'fitness', 'yoga')),
+        Rule(ENTERTAINMENT, ('theater', 'movie', 'club', 'stadium', 'rooftop')),
+        Rule(HOSPITALITY, hospitality),
+        Rule(RELIGIOUS, ('church', 'temple', 'mosque', 'synagogue')),
+        Rule(FAST_FOOD, fast_food, requires=all_food),
+        Rule(FINE_DINING, fine_dining, requires=all_food),
+        Rule(CAFE, CAFE_KEYWORDS, requires=all_food),
+        Rule(BAR, bar, requires=all_food),
+        Rule(RESTAURANT, all_food),
+    ]
+
+
+# Food inspection facility types
+FACILITY_FAST_FOOD_KEYWORDS = (
+    'raising cane', '7-eleven', 'pizza hut', 'wingstop', 'jimmy johns', 'dunkin',
+    'potbelly', 'chick-fil-a', 'dominos', 'mcdonald', 'kentucky', 'kfc',
+    'shake shack', 'burger king', 'taco bell', 'subway', 'wendy', 'popeyes'
+)
+FACILITY_FINE_DINING_KEYWORDS = ('steakhouse', 'bistro', 'chophouse', 'prime', 'fine dining')
+FACILITY_BAR_KEYWORDS = ('bar', 'pub', 'tavern', 'lounge', 'brewery', 'wine', 'cocktail', 'taproom')
+
+FACILITY_CLASSIFIER = Classifier(
+    category_rules(
+        retail=('grocery', 'market', 'liquor', 'retail', 'drug', 'drug store', 'convenience', 'supermarket',
+                'wholesale'),
+        hospitality=('hotel', 'motel'),
+        fast_food=FACILITY_FAST_FOOD_KEYWORDS,
+        fine_dining=FACILITY_FINE_DINING_KEYWORDS,
+        bar=FACILITY_BAR_KEYWORDS,
+        all_food=(FACILITY_FAST_FOOD_KEYWORDS + FACILITY_FINE_DINING_KEYWORDS + CAFE_KEYWORDS
+                  + FACILITY_BAR_KEYWORDS),
+    ),
+    default=OTHER,
+)
+
+# Business license description + entity name
+LICENSE_FAST_FOOD_KEYWORDS = (
+    'raising cane', 'pizza hut', 'wingstop', 'jimmy johns', 'dunkin',
+    'potbelly', 'chick-fil-a', 'dominos', 'mcdonald', 'kentucky', 'kfc',
+    'shake shack', 'burger king', 'taco bell', 'subway', 'wendy', 'popeyes', 'panda express'
+)
+LICENSE_FINE_DINING_KEYWORDS = ('steak', 'steakhouse', 'bistro', 'chophouse', 'prime', 'fine dining')
+LICENSE_BAR_KEYWORDS = ('bar', 'pub', 'tavern', 'lounge', 'brewery', 'wine', 'cocktail', 'taproom', 'beer')
+
+LICENSE_CLASSIFIER = Classifier(
+    category_rules(
+        retail=('grocery', 'market', 'liquor', 'store', 'drug', 'drug store', 'convenience', 'supermarket',
+                'wholesale', '7-eleven', 'cvs', 'walgreens'),
+        hospitality=('hotel', 'motel', 'hospitality'),
+        fast_food=LICENSE_FAST_FOOD_KEYWORDS,
+        fine_dining=LICENSE_FINE_DINING_KEYWORDS,
+        bar=LICENSE_BAR_KEYWORDS,
+        # 'beer' on its own does not make a place food
+        all_food=(LICENSE_FAST_FOOD_KEYWORDS + LICENSE_FINE_DINING_KEYWORDS + CAFE_KEYWORDS
+                  + tuple(kw for kw in LICENSE_BAR_KEYWORDS if kw != 'beer') + ('restaurant', 'pizza', 'burger')),
+    ),
+    default=OTHER,
+)
+
+CLASSIFIERS = {
+    'food_inspections': FACILITY_CLASSIFIER,
+    'business_licenses': LICENSE_CLASSIFIER,
+}
+
+
+def is_food(category: pd.Series) -> pd.Series:
+    # 1 for food categories, 0 otherwise
+    return category.isin(FOOD_CATEGORIES).astype(int)
+
+
+def artifact() -> dict:
+    return {
+        "version": TAXONOMY_VERSION,
+        "default": OTHER,
+        "food_categories": FOOD_CATEGORIES,
+        "classifiers": {
+            name: {
+                "fingerprint": classifier.fingerprint,
+                "rules": [
+                    {
+                        "label": rule.label,
+                        "pattern": pattern,
+                        "requires": requires,
+                        "keywords": list(rule.keywords),
+                    }
+                    for rule, (pattern, requires) in zip(classifier.rules, classifier.patterns)
+                ],
+            }
+            for name, classifier in CLASSIFIERS.items()
+        },
+    }
+
+
+if __name__ == "__main__":
+    output = json.dumps(artifact(), indent=2)
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
@@ -0,0 +1,204 @@
+"""
+Point-in-polygon assignment of Chicago zoning classes.
+
+``ZoningIndex`` parses the zoning polygons with shapely 2's vectorized
+constructors, prepares them and packs them into an ``STRtree``.  A lookup
+is one bulk tree query for bounding-box candidates followed by one
+vectorized ``contains`` test against the prepared polygons, which is the
+same as ``STRtree.query(points, predicate="within")`` but lets the
+polygons rather than the points be prepared.  Points outside the zoning
+extent (including the ``POINT(0 0)`` placeholders) are dropped by a
+bounding-box check before they reach the tree.
+
+Parsing the polygons is the expensive part of building an index, so
+``load_zoning_index`` keeps the parsed polygons as a GeoParquet artifact
+(WKB geometries plus per-polygon bounds) in GCS, keyed by a fingerprint
+of the zoning table's content, with a copy in ``/tmp`` for warm
+instances.  The artifact is only rebuilt when the zoning data changes.
+``load_geojson_zoning_index`` does the same for a GeoJSON file in GCS,
+caching the artifact next to the source blob keyed by its generation.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import shapely
+from google.cloud import bigquery, storage
+
+from common.bq_read import read_dataframe
+
+ARTIFACT_PREFIX = "zoning_index/"
+LOCAL_CACHE_DIR = "/tmp/zoning_index"
+
+
+class ZoningIndex:
+    def __init__(self, polygons: np.ndarray, zone_class: np.ndarray):
+        self.polygons = polygons
+        self.zone_class = zone_class
+        shapely.prepare(self.polygons)
+        self.tree = shapely.STRtree(self.polygons)
+        self.bounds = shapely.total_bounds(self.polygons)  # xmin, ymin, xmax, ymax
+
+    @classmethod
+    def from_geojson(cls, geometry: pd.Series, zone_class: pd.Series) -> "ZoningIndex":
+        polygons = shapely.from_geojson(geometry.to_numpy(dtype=object, na_value=None), on_invalid="ignore")
+        return cls.from_geometries(polygons, zone_class)
+
+    @classmethod
+    def from_geometries(cls, polygons: np.ndarray, zone_class: pd.Series) -> "ZoningIndex":
+        # Rows whose geometry is missing or failed to parse can never match
+        keep = ~shapely.is_missing(polygons)
+        zone_class = np.asarray(zone_class.to_numpy(dtype=object, na_value=None))
+        return cls(polygons[keep], zone_class[keep])
+
+    def lookup(self, points: np.ndarray) -> np.ndarray:
+        """
+        Index of the zoning polygon containing each point, or -1.
+
+        Where polygons overlap, the first one in input order is used.
+        """
+        points = np.asarray(points, dtype=object)
+        result = np.full(len(points), -1, dtype=np.int64)
+
+        x = shapely.get_x(points)  # NaN for missing geometries
+        y = shapely.get_y(points)
+        xmin, ymin, xmax, ymax = self.bounds
+        candidates = np.flatnonzero((x >= xmin) & (x <= xmax) & (y >= ymin) & (y <= ymax))
+        if len(candidates) == 0:
+            return result
+
+        # Bounding-box candidates from the tree, then one vectorized exact test
+        # against the prepared polygons (point within polygon == polygon contains point)
+        point_index, polygon_index = self.tree.query(points[candidates])
+        inside = shapely.contains(self.polygons[polygon_index], points[candidates][point_index])
+        point_index, polygon_index = point_index[inside], polygon_index[inside]
+
+        # Keep the first polygon per point
+        order = np.lexsort((polygon_index, point_index))
+        point_index, polygon_index = point_index[order], polygon_index[order]
+        first = np.unique(point_index, return_index=True)[1]
+        result[candidates[point_index[first]]] = polygon_index[first]
+        return result
+
+    def zone_classes(self, points: np.ndarray) -> np.ndarray:
+        # zone_class of the containing polygon, None where there is none
+        index = self.lookup(points)
+        classes = np.full(len(index), None, dtype=object)
+        matched = index != -1
+        classes[matched] = self.zone_class[index[matched]]
+        return classes
+
+    def write_parquet(self, path: str):
+        # GeoParquet: WKB geometry column plus bounds, readable by GeoPandas as well
+        xmin, ymin, xmax, ymax = shapely.bounds(self.polygons).T
+        table = pa.table({
+            "zone_class": pa.array(self.zone_class, type=pa.string()),
+            "geometry": pa.array(shapely.to_wkb(self.polygons), type=pa.binary()),
+            "xmin": xmin, "ymin": ymin, "xmax": xmax, "ymax": ymax,
+        })
+        geo = {
+            "version": "1.0.0",
+            "primary_column": "geometry",
+            "columns": {"geometry": {"encoding": "WKB", "geometry_types": [], "bbox": list(self.bounds)}},
+        }
+        table = table.replace_schema_metadata({b"geo": json.dumps(geo).encode("utf-8")})
+        pq.write_table(table, path, compression="zstd")
+
+    @classmethod
+    def read_parquet(cls, path: str) -> "ZoningIndex":
+        table = pq.read_table(path, columns=["zone_class", "geometry"], memory_map=True)
+        polygons = shapely.from_wkb(table["geometry"].to_numpy())
+        return cls(polygons, table["zone_class"].to_numpy(zero_copy_only=False))
+
+
+def zoning_fingerprint(client: bigquery.Client, table: str) -> str:
+    # Order-independent fingerprint of the zoning table, computed in BigQuery
+    query = f"""
+        SELECT COUNT(*) AS row_count,
+               BIT_XOR(FARM_FINGERPRINT(TO_JSON_STRING(STRUCT(zone_class, geometry)))) AS digest
+        FROM `{table}`
+    """
+    row = list(client.query(query).result())[0]
+    return f"{row['row_count']}-{(row['digest'] or 0) & 0xFFFFFFFFFFFFFFFF:016x}"
+
+
+def load_zoning_index(client: bigquery.Client, table: str, bucket_name: str) -> ZoningIndex:
+    """
+    The zoning index for ``table``, from the local cache, the GCS artifact
+    or, if the zoning data changed, built from the table and published.
+    """
+    name = f"{zoning_fingerprint(client, table)}.parquet"
+    local_path = os.path.join(LOCAL_CACHE_DIR, name)
+    if os.path.exists(local_path):
+        print(f"Using cached zoning index {name}.")
+        return ZoningIndex.read_parquet(local_path)
+
+    os.makedirs(LOCAL_CACHE_DIR, exist_ok=True)
+    blob = storage.Client().bucket(bucket_name).blob(ARTIFACT_PREFIX + name)
+    if blob.exists():
+        print(f"Downloading zoning index {name}.")
+        blob.download_to_filename(local_path + ".tmp")
+        os.replace(local_path + ".tmp", local_path)  # never leave a partial file in the cache
+        return ZoningIndex.read_parquet(local_path)
+
+    print(f"Building zoning index {name} from {table}.")
+    zoning_df = read_dataframe(client, f"SELECT zone_class, geometry FROM `{table}`")
+    index = ZoningIndex.from_geojson(zoning_df["geometry"], zoning_df["zone_class"])
+    index.write_parquet(local_path + ".tmp")
+    os.replace(local_path + ".tmp", local_path)
+    blob.upload_from_filename(local_path)
+    return index
+
+
+def read_geojson_features(path: str) -> tuple:
+    # GDAL is the fastest GeoJSON parser available; only needed when (re)building,
+    # so geopandas is imported here rather than on every warm run
+    import geopandas as gp
+    gdf = gp.read_file(path, columns=["zone_class"])
+    return np.asarray(gdf.geometry), gdf["zone_class"]
+
+
+def load_geojson_zoning_index(blob: storage.Blob, simplify_tolerance: float | None = None) -> ZoningIndex:
+    """
+    The zoning index for a GeoJSON blob, read from a GeoParquet artifact
+    stored next to it (``<name>.<generation>.parquet``), or parsed from the
+    GeoJSON and published if the blob changed since the artifact was made.
+
+    With ``simplify_tolerance`` (degrees) the polygons are simplified before
+    they are cached; the tolerance is part of the artifact name.
+    """
+    key = str(blob.generation or blob.md5_hash)
+    if simplify_tolerance:
+        key += f"-s{simplify_tolerance:g}"
+    name = f"{blob.name}.{key}.parquet"
+    local_path = os.path.join(LOCAL_CACHE_DIR, os.path.basename(name))
+    if os.path.exists(local_path):
+        print(f"Using cached zoning index {name}.")
+        return ZoningIndex.read_parquet(local_path)
+
+    os.makedirs(LOCAL_CACHE_DIR, exist_ok=True)
+    artifact = blob.bucket.blob(name)
+    if artifact.exists():
+        print(f"Downloading zoning index {name}.")
+        artifact.download_to_filename(local_path + ".tmp")
+        os.replace(local_path + ".tmp", local_path)
+        return ZoningIndex.read_parquet(local_path)
+
+    print(f"Building zoning index {name} from gs://{blob.bucket.name}/{blob.name}.")
+    blob.download_to_filename(local_path + ".geojson")
+    try:
+        polygons, zone_class = read_geojson_features(local_path + ".geojson")
+    finally:
+        os.remove(local_path + ".geojson")
+    index = ZoningIndex.from_geometries(polygons, zone_class)
+    if simplify_tolerance:
+        index = ZoningIndex(shapely.simplify(index.polygons, simplify_tolerance, preserve_topology=True),
+                            index.zone_class)
+    index.write_parquet(local_path + ".tmp")
+    os.replace(local_path + ".tmp", local_path)
+    artifact.upload_from_filename(local_path)
+    return index
@@ -5,72 +5,132 @@ Cloud Function entry-point:
   • Loads the DataFrame into BigQuery with google-cloud-bigquery
 """
 
-import io
+import os
 import sys
-import tempfile
-from typing import List, Tuple
+from datetime import datetime, timezone
 
 import pandas as pd
 import numpy as np
-import geopandas as gp
-from shapely.geometry import Point
+import shapely
 from google.cloud import storage, bigquery
-import pyarrow
+import pyarrow as pa
+import pyarrow.csv as pv
 
+from common.change_detection import mark_table_changed
+from common.zoning import ZoningIndex, load_geojson_zoning_index
 
-# ───────────────────────────────────────── Helper functions ──────────────────────────────────────────
 
-def get_block_type_from_zoning(
-    latitude: float,
-    longitude: float,
-    zoning_gdf: gp.GeoDataFrame
-) -> int | None:
-    point = Point(longitude, latitude)  # (lon, lat)
-
-    # spatial index speeds things up after first access
-    _ = zoning_gdf.sindex  
-
-    for _, row in zoning_gdf.iloc[list(zoning_gdf.sindex.intersection(point.bounds))].iterrows():
-        if row.geometry.contains(point):
-            z = row["zone_class"].strip()
-            if z.startswith("R") or z.startswith("M"):
-                return 0          # Residential / Manufacturing
-            if z.startswith(("B", "C")):
-                return 1          # Business / Commercial
-            if z.startswith(("D", "DC")):
-                return 2          # Downtown / High-traffic
-            return 1
-    return None
+# Yearly average foot traffic ranges [low, high) by block type 0/1/2
+YEARLY_RANGES  = np.array([[50, 501], [300, 1801], [2000, 8001]])
+OUTLIER_RANGES = np.array([[500, 1001], [1800, 3001], [8000, 12001]])
+OUTLIER_RATE   = 0.05
+UNKNOWN_BLOCK_PROBABILITIES = [0.50, 0.35, 0.15]
 
+MAX_SEED = 2**128           # same range as SeedSequence entropy; fits a BigQuery label value
+
+COORDINATE_SCALE = 10_000   # locations are deduplicated at 4 decimal places
 
-def generate_yearly_average_foot_traffic(
-    locations: List[Tuple[float, float]],
-    zoning_gdf: gp.GeoDataFrame
-) -> pd.DataFrame:
-    rng = np.random.default_rng()
-    rows = []
 
-    for lat, lon in locations:
-        block = get_block_type_from_zoning(lat, lon, zoning_gdf)
-        if block is None:
-            block = rng.choice([0, 1, 2], p=[0.50, 0.35, 0.15])
+# ───────────────────────────────────────── Helper functions ──────────────────────────────────────────
 
-        yearly = (
-            rng.integers(2000, 8001) if block == 2 else
-            rng.integers(300, 1801)  if block == 1 else
-            rng.integers(50, 501)
-        )
+def get_block_types(
+    latitude: np.ndarray,
+    longitude: np.ndarray,
+    zoning_index: ZoningIndex
+) -> np.ndarray:
+    # One bulk point-in-polygon query for all locations, then the zone_class
+    # prefix mapped to a block type; -1 where no zoning polygon contains the point
+    zone_class = pd.Series(zoning_index.zone_classes(shapely.points(longitude, latitude)), dtype=object)
+    z = zone_class.str.strip()
+    return np.select(
+        [
+            zone_class.isna().to_numpy(),
+            z.str.startswith(("R", "M"), na=False).to_numpy(),  # Residential / Manufacturing
+            z.str.startswith(("B", "C"), na=False).to_numpy(),  # Business / Commercial
+            z.str.startswith("D", na=False).to_numpy(),         # Downtown / High-traffic
+        ],
+        [-1, 0, 1, 2],
+        default=1,
+    )
 
-        if rng.random() < 0.05:                      # occasional outlier
-            yearly = (
-                rng.integers(8000, 12001) if block == 2 else
-                rng.integers(1800, 3001) if block == 1 else
-                rng.integers(500, 1001)
-            )
-        rows.append((lat, lon, yearly))
 
-    return pd.DataFrame(rows,
-                        columns=["latitude", "longitude", "yearly_average_foot_traffic"])
+def read_locations(stream) -> pd.DataFrame:
+    """
+    Distinct (Latitude, Longitude) pairs, rounded to 4 decimals, from a CSV stream.
+
+    Only the two coordinate columns are parsed, batch by batch, and each
+    pair is packed into one int64 key of quantized coordinates so duplicates
+    are dropped on integers instead of float pairs.  The columns are parsed
+    as float64: float32 is too coarse near 42 degrees to round to 4 decimals
+    the same way as before.
+    """
+    reader = pv.open_csv(stream, convert_options=pv.ConvertOptions(
+        include_columns=["Latitude", "Longitude"],
+        column_types={"Latitude": pa.float64(), "Longitude": pa.float64()},
+    ))
+    keys = []
+    for batch in reader:
+        latitude = batch.column("Latitude").to_numpy(zero_copy_only=False)
+        longitude = batch.column("Longitude").to_numpy(zero_copy_only=False)
+        valid = ~(np.isnan(latitude) | np.isnan(longitude))
+        lat_key = np.rint(latitude[valid] * COORDINATE_SCALE).astype(np.int64)
+        lon_key = np.rint(longitude[valid] * COORDINATE_SCALE).astype(np.int64)
+        keys.append(pd.unique((lat_key << 32) | (lon_key & 0xFFFFFFFF)))
+
+    key = pd.unique(np.concatenate(keys)) if keys else np.empty(0, dtype=np.int64)
+    return pd.DataFrame({
+        "Latitude": (key >> 32) / COORDINATE_SCALE,
+        "Longitude": (key.astype(np.uint32).view(np.int32)) / COORDINATE_SCALE,
+    })
+
+
+def generate_yearly_average_foot_traffic(
+    locations_df: pd.DataFrame,
+    zoning_index: ZoningIndex,
+    seed: int
+) -> pd.DataFrame:
+    # All draws are done as array operations, so the same seed reproduces the same table
+    rng = np.random.default_rng(seed)
+
+    latitude = locations_df["Latitude"].to_numpy(dtype=float)
+    longitude = locations_df["Longitude"].to_numpy(dtype=float)
+    blocks = get_block_types(latitude, longitude, zoning_index)
+
+    # Locations outside every zoning polygon get a random block type
+    unknown = blocks == -1
+    blocks[unknown] = rng.choice([0, 1, 2], size=unknown.sum(), p=UNKNOWN_BLOCK_PROBABILITIES)
+
+    outlier = rng.random(len(blocks)) < OUTLIER_RATE   # occasional outlier
+    ranges = np.where(outlier[:, None], OUTLIER_RANGES[blocks], YEARLY_RANGES[blocks])
+    yearly = rng.integers(ranges[:, 0], ranges[:, 1])
+
+    return pd.DataFrame({
+        "latitude": latitude,
+        "longitude": longitude,
+        "yearly_average_foot_traffic": yearly,
+    })
+
+
+def get_seed(request) -> int:
+    """
+    ?seed= on the trigger wins over the FOOT_TRAFFIC_SEED env var; otherwise a fresh one.
+
+    Raises ValueError unless the seed is an integer in [0, MAX_SEED).
+    """
+    seed = None
+    if request is not None and getattr(request, "args", None):
+        seed = request.args.get("seed")
+    seed = seed or os.environ.get("FOOT_TRAFFIC_SEED")
+    if not seed:
+        return int(np.random.SeedSequence().entropy)
+
+    try:
+        seed = int(seed)
+    except ValueError:
+        raise ValueError(f"seed must be an integer, got {seed[:40]!r}") from None
+    if not 0 <= seed < MAX_SEED:
+        raise ValueError("seed must be between 0 and 2**128 - 1")
+    return seed
 
 
 # ─────────────────────────────────────────── main() ──────────────────────────────────────────────────
@@ -84,37 +144,37 @@ def main(request):
     DATASET_ID         = "foot_traffic_chicago"
     TABLE_ID           = "yearly_average"
 
+    # Reject a bad ?seed= before doing any work
+    try:
+        seed = get_seed(request)
+    except ValueError as e:
+        print(f"Invalid seed: {e}")
+        return (f"Invalid seed: {e}", 400)
+
+    started_at     = datetime.now(timezone.utc)
     storage_client = storage.Client()
     bucket         = storage_client.bucket(BUCKET)
 
-    # --- Load CSV directly into pandas ---
+    # --- Stream the two coordinate columns out of the CSV ---
     loc_blob = bucket.blob(LOC_FILE)
     if not loc_blob.exists():
         sys.exit(f"ERROR: blob gs://{BUCKET}/{LOC_FILE} not found")
 
-    loc_bytes = loc_blob.download_as_bytes()
-    locations_df = (
-        pd.read_csv(io.BytesIO(loc_bytes))[["Latitude", "Longitude"]]
-          .round(4)
-          .dropna()
-          .drop_duplicates()
-    )
+    with loc_blob.open("rb") as stream:
+        locations_df = read_locations(stream)
+    print(f"Read {len(locations_df)} distinct locations from {LOC_FILE}")
 
-    # --- Load GeoJSON into GeoPandas ---
-    zone_blob = bucket.blob(ZONE_FILE)
-    if not zone_blob.exists():
+    # --- Load zoning polygons (GeoParquet cache of the GeoJSON) ---
+    zone_blob = bucket.get_blob(ZONE_FILE)   # None if missing; carries the generation
+    if zone_blob is None:
         sys.exit(f"ERROR: blob gs://{BUCKET}/{ZONE_FILE} not found")
 
-    with tempfile.NamedTemporaryFile(suffix=".geojson") as tmp:
-        zone_blob.download_to_file(tmp)
-        tmp.flush()
-        zoning_gdf = gp.read_file(tmp.name)
+    tolerance = os.environ.get("ZONING_SIMPLIFY_TOLERANCE")
+    zoning_index = load_geojson_zoning_index(zone_blob, float(tolerance) if tolerance else None)
 
     # --- Generate synthetic traffic ---
-    foot_traffic_df = generate_yearly_average_foot_traffic(
-        list(locations_df.itertuples(index=False, name=None)),
-        zoning_gdf,
-    )
+    print(f"Generating foot traffic with seed {seed}")
+    foot_traffic_df = generate_yearly_average_foot_traffic(locations_df, zoning_index, seed)
 
     # --- Write DataFrame to BigQuery ---
     bq_client  = bigquery.Client(project=PROJECT_ID)
@@ -129,4 +189,12 @@ def main(request):
     )
     job.result()                       # wait for completion
     print(f"Loaded {job.output_rows} rows into {PROJECT_ID}:{DATASET_ID}.{TABLE_ID}")
+
+    # Record the seed on the table so the run can be reproduced
+    table = bq_client.get_table(table_ref)
+    table.labels = {**(table.labels or {}), "generation_seed": str(seed)}
+    bq_client.update_table(table, ["labels"])
+
+    # Lets the master table see that its foot traffic input changed
+    mark_table_changed(bq_client, f"{PROJECT_ID}.{DATASET_ID}.{TABLE_ID}", started_at)
     return ("Done", 200)
@@ -1,16 +1,33 @@
 import os
 import ast
 import json
+import time
+from datetime import datetime, timezone
 import pandas_gbq
 import numpy as np
 import pandas as pd
 import geopandas as gpd
+import shapely
 
+from concurrent.futures import ThreadPoolExecutor
 from google.cloud import storage
 from google.cloud import bigquery
-from scipy.spatial import cKDTree
-from shapely.geometry import shape
-from shapely.wkt import loads as wkt_loads
+
+from common.bq_read import read_dataframes
+from common.change_detection import inputs_unchanged, mark_table_changed
+from common.geometry import to_wkb
+from common.nearest import PointIndex, inverse_distance_weighting
+from common.query import select_wkb
+from common.zoning import load_zoning_index
+from neighborhood_features import dedupe_points, neighborhood_counts
+
+# Low-cardinality string columns are downloaded as categoricals
+CATEGORICALS = ('category', 'zip_code')
+
+# Foot traffic score: inverse-distance weighted over up to this many counters within this radius,
+# otherwise the nearest counter's value
+FOOT_TRAFFIC_NEIGHBOURS = 4
+FOOT_TRAFFIC_RADIUS_M = 1500
 
 def create_master_table(request):
     client = bigquery.Client()
@@ -24,22 +41,37 @@ def create_master_table(request):
     foot_traffic_table = os.environ["FOOT_TRAFFIC_TABLE"]
     master_table = os.environ["OUTPUT_TABLE"]
 
-    food_inspection_df = client.query(f"SELECT * FROM `{food_inspection_table}`").to_dataframe()
-    food_license_df = client.query(f"SELECT * FROM `{food_license_table}`").to_dataframe()
-    divvy_stations_df = client.query(f"SELECT * FROM `{divvy_stations_table}`").to_dataframe()
-    population_counts_df = client.query(f"SELECT * FROM `{population_counts_table}`").to_dataframe()
-    zoning_data_df = client.query(f"SELECT * FROM `{zoning_data_table}`").to_dataframe()
-    bus_station_df = client.query(f"SELECT * FROM `{bus_station_table}`").to_dataframe()
-    foot_traffic_df = client.query(f"SELECT * FROM `{foot_traffic_table}`").to_dataframe()
-
-
-    print(f"Retrieved {len(food_inspection_df)} rows from {food_inspection_table}")
-    print(f"Retrieved {len(food_license_df)} rows from {food_license_table}")
-    print(f"Retrieved {len(divvy_stations_df)} rows from {divvy_stations_table}")
-    print(f"Retrieved {len(population_counts_df)} rows from {population_counts_table}")
-    print(f"Retrieved {len(zoning_data_df)} rows from {zoning_data_table}")
-    print(f"Retrieved {len(bus_station_df)} rows from {bus_station_table}")
-    print(f"Retrieved {len(foot_traffic_df)} rows from {foot_traffic_table}")
+    # Nothing to do if no input has changed since the master table was built
+    input_tables = [food_inspection_table, food_license_table, divvy_stations_table, population_counts_table,
+                    zoning_data_table, bus_station_table, foot_traffic_table]
+    if inputs_unchanged(client, request, input_tables, master_table):
+        print(f"No input has changed since {master_table} was built; skipped.")
+        return "Master table inputs unchanged; master table left as is."
+    started_at = datetime.now(timezone.utc)
+
+    # Start all input queries at once and download them concurrently,
+    # so the I/O phase takes as long as the slowest table
+    start = time.perf_counter()
+    # The zoning index is only rebuilt from the zoning table when its content changed
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        zoning_future = executor.submit(load_zoning_index, client, zoning_data_table, os.environ["ARTIFACT_BUCKET"])
+        inputs = read_dataframes(client, {
+            food_inspection_table: select_wkb(food_inspection_table, ["location"]),
+            food_license_table: select_wkb(food_license_table, ["location"]),
+            divvy_stations_table: select_wkb(divvy_stations_table, ["location"]),
+            population_counts_table: f"SELECT * FROM `{population_counts_table}`",
+            bus_station_table: select_wkb(bus_station_table, ["location"]),
+            foot_traffic_table: f"SELECT * FROM `{foot_traffic_table}`",
+        }, CATEGORICALS)
+        zoning_index = zoning_future.result()
+    print(f"Read all master table inputs in {time.perf_counter() - start:.1f}s")
+
+    food_inspection_df = inputs[food_inspection_table]
+    food_license_df = inputs[food_license_table]
+    divvy_stations_df = inputs[divvy_stations_table]
+    population_counts_df = inputs[population_counts_table]
+    bus_station_df = inputs[bus_station_table]
+    foot_traffic_df = inputs[foot_traffic_table]
 
 
     # Add boolean col (this is help in looker filtering food/bus_stop/divvy_station if needed)
@@ -65,25 +97,24 @@ def create_master_table(request):
 
     # Append point type data sources together
     draft_df = pd.concat([food_license_df, food_inspection_df, bus_station_df, divvy_stations_df], ignore_index=True)
-    # Fill missing 'location' with a placeholder WKT string
-    draft_df['location'] = draft_df['location'].fillna("POINT(0 0)")
+    # Points arrive as WKB; parse them in one vectorized call and place rows without one at POINT(0 0)
+    geometry = shapely.from_wkb(draft_df['location'].to_numpy(dtype=object, na_value=None))
+    geometry[shapely.is_missing(geometry)] = shapely.Point(0, 0)
     # wrap the DataFrame into a GeoDataFrame that supports spatial joins, distance calculations, and exporting to BigQuery as a GEOGRAPHY column.
-    draft_df['geometry'] = draft_df['location'].apply(wkt_loads)
-    # Convert to GeoDataFrame
-    combined_gdf = gpd.GeoDataFrame(draft_df, geometry='geometry', crs='EPSG:4326')
+    draft_df['geometry'] = geometry
+    draft_df['location'] = to_wkb(geometry)
+    # Convert to GeoDataFrame; one row per point from here on
+    combined_gdf = gpd.GeoDataFrame(dedupe_points(draft_df), geometry='geometry', crs='EPSG:4326')
 
 
-    # Convert geometry string to actual geometry objects, then convert to GeoDataFrame
-    zoning_data_df['geometry'] = zoning_data_df['geometry'].apply(lambda x: shape(json.loads(x)))
-    zoning_gdf = gpd.GeoDataFrame(zoning_data_df, geometry='geometry', crs='EPSG:4326')
+    # Assign each point the zone_class of the zoning polygon it falls within
+    combined_gdf['zone_class'] = zoning_index.zone_classes(combined_gdf.geometry.values)
 
-    # Now we can perform a spatial join to combine the zoning data with the combined GeoDataFrame
-    combined_gdf = gpd.sjoin(
-        combined_gdf, 
-        zoning_gdf[['geometry', 'zone_class']], 
-        how='left', 
-        predicate='within'
-    )
+    # Counts of bus stops, Divvy stations, cafes, schools, bars and fast food within 250 m / 500 m / 1 km.
+    # Taken on the deduplicated points, before the demographics merge repeats rows per year
+    neighborhood_df = neighborhood_counts(combined_gdf, shapely.get_x(combined_gdf.geometry.values),
+                                          shapely.get_y(combined_gdf.geometry.values))
+    combined_gdf = combined_gdf.join(neighborhood_df)
 
     # Clean up zip_code formatting
     combined_gdf['zip_code'] = combined_gdf['zip_code'].astype(str).str.zfill(5)
@@ -96,27 +127,26 @@ def create_master_table(request):
         how='left'
     )
 
-    # Convert foot traffic to GeoDataFrame
+    # Foot traffic interpolated from the nearest counters by inverse-distance weighting,
+    # by great-circle distance. Coordinates come straight from the geometry and numeric columns.
     foot_traffic_df = foot_traffic_df.dropna(subset=['latitude', 'longitude'])
-    foot_traffic_gdf = gpd.GeoDataFrame(
-        foot_traffic_df,
-        geometry=gpd.points_from_xy(foot_traffic_df['longitude'], foot_traffic_df['latitude']),
-        crs='EPSG:4326'
-    )
-
-    # Convert both to numpy arrays for fast spatial search
-    master_coords = np.array(list(combined_gdf.geometry.apply(lambda geom: (geom.x, geom.y))))
-    traffic_coords = np.array(list(foot_traffic_gdf.geometry.apply(lambda geom: (geom.x, geom.y))))
-
-    tree = cKDTree(traffic_coords)
-    _, indices = tree.query(master_coords, k=1)  # k=1 for nearest
-
-    # Assign the nearest foot traffic score
-    combined_gdf['foot_traffic_score'] = foot_traffic_gdf.iloc[indices]['yearly_average_foot_traffic'].values
+    traffic_index = PointIndex(foot_traffic_df['longitude'], foot_traffic_df['latitude'])
+    distance_m, indices = traffic_index.k_nearest(shapely.get_x(combined_gdf.geometry.values),
+                                                  shapely.get_y(combined_gdf.geometry.values),
+                                                  FOOT_TRAFFIC_NEIGHBOURS)
+    traffic_values = foot_traffic_df['yearly_average_foot_traffic'].to_numpy(dtype=float)
+    score, neighbours = inverse_distance_weighting(distance_m, indices, traffic_values, FOOT_TRAFFIC_RADIUS_M)
+
+    # With no counter within the radius, fall back to the nearest counter's value so every
+    # row keeps a score (the prediction query skips null scores); foot_traffic_neighbours = 0
+    # and foot_traffic_distance_m flag these rows
+    score = np.where(neighbours == 0, traffic_values[indices[:, 0]], score)
+    combined_gdf['foot_traffic_score'] = score.round().astype(np.int64)
+    combined_gdf['foot_traffic_neighbours'] = neighbours
+    combined_gdf['foot_traffic_distance_m'] = distance_m[:, 0].round(1)
 
     # some final organization before upload
-    combined_gdf = combined_gdf.drop(columns=['index_right', 
-                                            'legal_name',
+    combined_gdf = combined_gdf.drop(columns=['legal_name',
                                             'business_activity',
                                             'business_activity_id',
                                             'license_description',
@@ -140,6 +170,8 @@ def create_master_table(request):
         'category',
         'fake_location_score',
         'foot_traffic_score',
+        'foot_traffic_neighbours',
+        'foot_traffic_distance_m',
         'zone_class',
         'location',
         'longitude',
@@ -150,6 +182,7 @@ def create_master_table(request):
         'population_18_to_29',
         'population_30_to_39',
         'population_40_to_49',
+        *neighborhood_df.columns,
         'geometry'
     ]
 
@@ -168,17 +201,26 @@ def create_master_table(request):
     # Combine them back together
     final_gdf = pd.concat([to_clean, not_to_clean], ignore_index=True)
     
+    # Geometries go to BigQuery as WKB, which the Parquet load writes straight into GEOGRAPHY columns
+    final_df = pd.DataFrame(final_gdf)
+    final_df['geometry'] = to_wkb(np.asarray(final_gdf.geometry))
+
     # Define the job config
     job_config = bigquery.LoadJobConfig(
         autodetect=True,  # Automatically detects schema from DataFrame
+        schema=[
+            bigquery.SchemaField("location", "GEOGRAPHY"),
+            bigquery.SchemaField("geometry", "GEOGRAPHY"),
+        ],
         write_disposition="WRITE_TRUNCATE"  # Overwrites the table if it exists
     )
 
     # Upload the DataFrame to BigQuery
-    job = client.load_table_from_dataframe(final_gdf, master_table, job_config=job_config)
+    job = client.load_table_from_dataframe(final_df, master_table, job_config=job_config)
 
     # Wait for the job to complete
     job.result()
+    mark_table_changed(client, master_table, started_at)
 
     print(f"✅ Upload completed. {len(final_gdf)} rows written to {master_table}")
     return f"Successfully uploaded {len(final_gdf)} rows to BigQuery."
@@ -0,0 +1,80 @@
+"""
+Neighbourhood features for the location score.
+
+For every master table point, counts the bus stops, Divvy stations, cafes,
+schools, bars and fast-food competitors within each radius.  Each point
+class gets its own KD-tree (see ``common.nearest``) and every radius is
+one vectorized ``query_ball_point`` pass over all points.
+
+Counts must be taken on the master table's point set, i.e. after
+``dedupe_points`` and before rows are repeated by the demographics merge.
+Rows describing the same point (same name, address and location) are
+still only counted once, and never as their own neighbour.
+"""
+
+import numpy as np
+import pandas as pd
+
+from common.nearest import PointIndex
+from common.taxonomy import BAR, CAFE, FAST_FOOD, SCHOOL
+
+RADII_M = (250, 500, 1000)
+
+# Feature name -> (column, value) selecting the points of that class; categories are
+# the shared taxonomy's labels
+POINT_CLASSES = {
+    'bus_stops': ('is_bus_stop', 1),
+    'divvy_stations': ('is_divvy_station', 1),
+    'cafes': ('category', CAFE),
+    'schools': ('category', SCHOOL),
+    'bars': ('category', BAR),
+    'fast_food': ('category', FAST_FOOD),
+}
+
+
+# Columns that, together with the location, identify one point
+POINT_KEY = ['entity_name', 'address']
+
+
+def dedupe_points(df: pd.DataFrame) -> pd.DataFrame:
+    # A business can appear in both the license and the inspection inputs; keep its
+    # first row.  Bus and Divvy stations have no address and are all kept.
+    has_address = df['address'].notna()
+    duplicate = has_address & df.duplicated(subset=POINT_KEY, keep='first')
+    return df[~duplicate]
+
+
+def neighborhood_counts(df: pd.DataFrame, longitude: np.ndarray, latitude: np.ndarray,
+                        radii_m: tuple = RADII_M) -> pd.DataFrame:
+    """
+    One ``<class>_within_<radius>m`` count column per point class and radius,
+    aligned with ``df``.  A point is never counted as its own neighbour, and
+    duplicate rows of one point are counted once.
+    """
+    longitude = np.asarray(longitude, dtype=float)
+    latitude = np.asarray(latitude, dtype=float)
+    # POINT(0 0) placeholders are not real locations
+    located = ~((longitude == 0) & (latitude == 0)) & ~np.isnan(longitude) & ~np.isnan(latitude)
+
+    # Rows with the same key are the same point
+    key = df[POINT_KEY].assign(longitude=longitude, latitude=latitude)
+    first = ~key.duplicated(keep='first').to_numpy()
+
+    features = {}
+    for name, (column, value) in POINT_CLASSES.items():
+        members = located & (df[column] == value).fillna(False).to_numpy(dtype=bool)
+        if not members.any():
+            for radius in radii_m:
+                features[f'{name}_within_{radius}m'] = np.zeros(len(df), dtype=np.int64)
+            continue
+
+        # Index each point of the class once, however many rows describe it
+        unique = members & first
+        index = PointIndex(longitude[unique], latitude[unique])
+        for radius in radii_m:
+            counts = np.zeros(len(df), dtype=np.int64)
+            counts[located] = index.count_within(longitude[located], latitude[located], radius)
+            counts[members] -= 1  # the point itself, indexed once
+            features[f'{name}_within_{radius}m'] = counts
+
+    return pd.DataFrame(features, index=df.index)
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Cloud functions import the shared code as ``common`` and their siblings by module name
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "master", "master_table"))
@@ -0,0 +1,60 @@
+import pyarrow as pa
+import pytest
+from google.cloud import bigquery
+
+from common import bq_read
+
+
+class FinishedJob:
+    # A finished query job whose row iterator can only be read once, like RowIterator
+    def __init__(self, schema, batches):
+        self.rows = Rows(schema, batches)
+
+    def result(self):
+        return self.rows
+
+
+class Rows:
+    def __init__(self, schema, batches):
+        self.schema = schema
+        self.batches = batches
+        self.started = False
+
+    def to_arrow_iterable(self, bqstorage_client=None, max_stream_count=None):
+        if self.started:
+            raise ValueError("Iterator has already started")
+        self.started = True
+        yield from self.batches
+
+
+SCHEMA = [
+    bigquery.SchemaField("category", "STRING"),
+    bigquery.SchemaField("is_food", "INTEGER"),
+    bigquery.SchemaField("location", "BYTES"),
+]
+
+
+@pytest.fixture(autouse=True)
+def no_storage_client(monkeypatch):
+    monkeypatch.setattr(bq_read, "_read_client", object())
+
+
+def test_empty_result_keeps_schema():
+    table = bq_read.job_to_arrow(FinishedJob(SCHEMA, []))
+    assert table.num_rows == 0
+    assert table.column_names == ["category", "is_food", "location"]
+    assert table.schema.field("is_food").type == pa.int64()
+
+    df = bq_read.to_dataframe(table, categoricals=("category",))
+    assert len(df) == 0
+    assert list(df.columns) == ["category", "is_food", "location"]
+    assert str(df["category"].dtype) == "category"
+
+
+def test_batches_are_concatenated():
+    batch = pa.record_batch({"category": ["cafe", "bar"], "is_food": [1, 1], "location": [b"", b""]})
+    table = bq_read.job_to_arrow(FinishedJob(SCHEMA, [batch, batch]))
+    assert table.num_rows == 4
+    df = bq_read.to_dataframe(table, categoricals=("category",))
+    assert str(df["is_food"].dtype) == "Int64"
+    assert list(df["category"].cat.categories) == ["cafe", "bar"]
@@ -0,0 +1,55 @@
+from types import SimpleNamespace
+
+import pandas as pd
+import pyarrow as pa
+
+from common.category_lookup import CategoryLookup
+from common.classifier import combine_text
+from common.taxonomy import LICENSE_CLASSIFIER
+
+
+class MemoryLookup(CategoryLookup):
+    # CategoryLookup with the BigQuery table replaced by a dict
+    def __init__(self, stored: dict):
+        super().__init__(SimpleNamespace(project="test-project"), "business_licenses")
+        self.stored = dict(stored)
+        self.replaced = 0
+
+    def load(self, fingerprint):
+        return dict(self.stored)
+
+    def replace(self, fingerprint, texts, labels):
+        self.replaced += 1
+        self.stored = dict(zip(texts, labels))
+
+
+def texts(*pairs):
+    return combine_text(pd.Series([p[0] for p in pairs]), pd.Series([p[1] for p in pairs]))
+
+
+def test_only_this_runs_values_are_kept():
+    lookup = MemoryLookup({"retail food establishment gone cafe": "cafe"})
+    text = texts(("Retail Food Establishment", "STARBUCKS"), ("Retail Food Establishment", "JOES PIZZA"))
+
+    labels = LICENSE_CLASSIFIER.classify(text, lookup)
+
+    assert list(labels) == ["cafe", "restaurant"]
+    assert lookup.stored == {
+        "retail food establishment starbucks": "cafe",
+        "retail food establishment joes pizza": "restaurant",
+    }
+
+
+def test_unchanged_values_are_not_rewritten():
+    text = texts(("Retail Food Establishment", "STARBUCKS"))
+    lookup = MemoryLookup({"retail food establishment starbucks": "cafe"})
+
+    assert list(LICENSE_CLASSIFIER.classify(text, lookup)) == ["cafe"]
+    assert lookup.replaced == 0
+
+
+def test_stored_labels_are_used():
+    # A stored label wins over the rules: the value is not classified again
+    lookup = MemoryLookup({"retail food establishment starbucks": "bar"})
+    labels = lookup.label_codes(LICENSE_CLASSIFIER, pa.array(["retail food establishment starbucks"]))
+    assert [LICENSE_CLASSIFIER.labels[code] for code in labels] == ["bar"]
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+from common.taxonomy import CLASSIFIERS
+from neighborhood_features import POINT_CLASSES, dedupe_points, neighborhood_counts
+
+
+def master_points():
+    # Two cafes ~100 m apart, each present in both the license and the inspection input,
+    # plus a bus stop between them
+    return pd.DataFrame({
+        'entity_name': ['CAFE A', 'CAFE B', 'CAFE A', 'CAFE B', 'STOP 1'],
+        'address': ['1 N STATE ST', '9 N STATE ST', '1 N STATE ST', '9 N STATE ST', None],
+        'category': ['cafe', 'cafe', 'cafe', 'cafe', None],
+        'is_bus_stop': [0, 0, 0, 0, 1],
+        'is_divvy_station': [0, 0, 0, 0, 0],
+        'zip_code': ['60602'] * 5,
+        'longitude': [-87.6278, -87.6278, -87.6278, -87.6278, -87.6278],
+        'latitude': [41.8820, 41.8829, 41.8820, 41.8829, 41.8825],
+    })
+
+
+def population():
+    # Three demographics years for the same zip code
+    return pd.DataFrame({'zip_code': ['60602'] * 3, 'year': [2021, 2022, 2023], 'population_total': [1, 2, 3]})
+
+
+def counts(df):
+    return neighborhood_counts(df, df['longitude'].to_numpy(), df['latitude'].to_numpy())
+
+
+def test_counts_before_population_merge():
+    points = dedupe_points(master_points())
+    merged = points.join(counts(points)).merge(population(), on='zip_code', how='left')
+
+    cafes = merged[merged['category'] == 'cafe']
+    assert len(cafes) == 6
+    assert (cafes['cafes_within_250m'] == 1).all()
+    assert (merged.loc[merged['is_bus_stop'] == 1, 'cafes_within_250m'] == 2).all()
+    assert (cafes['bus_stops_within_250m'] == 1).all()
+
+
+def test_duplicate_rows_are_one_point():
+    # Even on the duplicated, merged rows a point is counted once and never as its own neighbour
+    merged = master_points().merge(population(), on='zip_code', how='left')
+    result = counts(merged)
+
+    cafes = (merged['category'] == 'cafe').to_numpy()
+    assert (result.loc[cafes, 'cafes_within_250m'] == 1).all()
+    assert (result.loc[~cafes, 'cafes_within_250m'] == 2).all()
+    assert (result.loc[~cafes, 'bus_stops_within_250m'] == 0).all()
+
+
+def test_placeholder_points_are_ignored():
+    df = master_points()
+    df.loc[0, ['longitude', 'latitude']] = 0.0
+    result = counts(df)
+    assert result.loc[0].sum() == 0
+    assert result.loc[1, 'cafes_within_250m'] == 1
+
+
+def test_point_categories_are_taxonomy_labels():
+    # A category no classifier produces would silently count zero points
+    for column, value in POINT_CLASSES.values():
+        if column == 'category':
+            assert all(value in classifier.labels for classifier in CLASSIFIERS.values())
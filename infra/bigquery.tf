@@ -149,4 +149,29 @@ resource "google_bigquery_table" "clean_cta_bus_stations" {
   table_id   = "clean_cta_bus_stations"
 
   deletion_protection = false
-}
\ No newline at end of file
+}
+
+################# INGESTION METADATA
+
+resource "google_bigquery_dataset" "ingestion_metadata" {
+  dataset_id = "ingestion_metadata"
+  location   = "US"
+}
+
+resource "google_bigquery_table" "ingestion_watermarks" {
+  dataset_id = google_bigquery_dataset.ingestion_metadata.dataset_id
+  table_id   = "watermarks"
+
+  deletion_protection = false
+
+  schema = file("${path.module}/schema/watermarks_schema.json")
+}
+
+resource "google_bigquery_table" "category_lookup" {
+  dataset_id = google_bigquery_dataset.ingestion_metadata.dataset_id
+  table_id   = "category_lookup"
+
+  deletion_protection = false
+
+  schema = file("${path.module}/schema/category_lookup_schema.json")
+}
@@ -31,6 +31,8 @@ resource "google_cloudfunctions_function" "master_table_function" {
 
     ZIP_BUCKET = google_storage_bucket.metrogrub_cloud_function_bucket.name
     ZIP_PREFIX = "zip_shapes/"
+
+    ARTIFACT_BUCKET = google_storage_bucket.metrogrub_cloud_function_bucket.name
   }
 }
 
@@ -50,6 +52,8 @@ resource "google_cloudfunctions_function" "demographics_function" {
 
   environment_variables = {
     "BIGQUERY_TABLE" = "${google_bigquery_table.population_counts.id}"
+    "INGESTION_BUCKET" = google_storage_bucket.metrogrub_cloud_function_bucket.name
+    "SOCRATA_APP_TOKEN" = var.socrata_app_token
   }
 }
 
@@ -87,6 +91,8 @@ resource "google_cloudfunctions_function" "zoning_function" {
 
   environment_variables = {
     "BIGQUERY_TABLE" = google_bigquery_table.zoning_data.id
+    "INGESTION_BUCKET" = google_storage_bucket.metrogrub_cloud_function_bucket.name
+    "SOCRATA_APP_TOKEN" = var.socrata_app_token
   }
 }
 
@@ -123,6 +129,8 @@ resource "google_cloudfunctions_function" "business_licenses_function" {
 
   environment_variables = {
     "BIGQUERY_TABLE" = google_bigquery_table.active_business_licenses.id
+    "INGESTION_BUCKET" = google_storage_bucket.metrogrub_cloud_function_bucket.name
+    "SOCRATA_APP_TOKEN" = var.socrata_app_token
   }
 }
 
@@ -159,6 +167,8 @@ resource "google_cloudfunctions_function" "food_inspections_function" {
 
   environment_variables = {
     "BIGQUERY_TABLE" = google_bigquery_table.food_inspections.id
+    "INGESTION_BUCKET" = google_storage_bucket.metrogrub_cloud_function_bucket.name
+    "SOCRATA_APP_TOKEN" = var.socrata_app_token
   }
 }
 
@@ -195,6 +205,8 @@ resource "google_cloudfunctions_function" "divvy_stations_function" {
 
   environment_variables = {
     "BIGQUERY_TABLE" = google_bigquery_table.divvy_stations.id
+    "INGESTION_BUCKET" = google_storage_bucket.metrogrub_cloud_function_bucket.name
+    "SOCRATA_APP_TOKEN" = var.socrata_app_token
   }
 }
 
@@ -230,6 +242,8 @@ resource "google_cloudfunctions_function" "cta_bus_stations_function" {
 
   environment_variables = {
     "BIGQUERY_TABLE" = google_bigquery_table.cta_bus_stations.id
+    "INGESTION_BUCKET" = google_storage_bucket.metrogrub_cloud_function_bucket.name
+    "SOCRATA_APP_TOKEN" = var.socrata_app_token
   }
 }
 
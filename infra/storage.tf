@@ -4,6 +4,17 @@ resource "google_storage_bucket" "metrogrub_cloud_function_bucket" {
   name     = "metrogrub-cloud-function-bucket-${var.project_id}"
   location = "US"
   force_destroy = true
+
+  # Ingestion checkpoints are never resumed after 24 hours (MAX_CHECKPOINT_AGE), so delete them after a day
+  lifecycle_rule {
+    condition {
+      age            = 1
+      matches_prefix = ["ingestion/"]
+    }
+    action {
+      type = "Delete"
+    }
+  }
 }
 
 ################# MASTER TABLE
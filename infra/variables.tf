@@ -13,3 +13,10 @@ variable "foot_traffic_table" {
   description = "Fully-qualified BigQuery table ID (project.dataset.table)"
   type        = string
 }
+
+variable "socrata_app_token" {
+  description = "City of Chicago (Socrata) app token sent by the ingestion functions; raises the API rate limit"
+  type        = string
+  default     = ""
+  sensitive   = true
+}